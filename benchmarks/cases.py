@@ -0,0 +1,104 @@
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+from media_core.labs import load_lab_module
+
+from data import synthetic_binary, synthetic_glyph_page, synthetic_image, synthetic_wav
+
+SCHARR_X = np.array([[-3, 0, 3], [-10, 0, 10], [-3, 0, 3]], dtype=np.float64)
+
+
+@dataclass
+class Case:
+    name: str
+    lab: str
+    kind: str
+    prepare: Callable
+    # Pure-Python pixel loops would take hours at 8192^2, so they stop at
+    # this size unless the run asks for everything.
+    max_size: Optional[float] = None
+
+    @property
+    def unit(self):
+        return "pixels" if self.kind == "image" else "samples"
+
+
+def _stretch_image(side, data_dir):
+    tools = load_lab_module("lab_01")
+    image = synthetic_image(side)
+    return lambda: tools.stretch_image(image, 2.0), side * side
+
+
+def _niblack_binarization(side, data_dir):
+    tools = load_lab_module("lab_02")
+    image = synthetic_image(side, channels=1)
+    return lambda: tools.niblack_binarization(image, 15, -0.2), side * side
+
+
+def _filter_image(side, data_dir):
+    tools = load_lab_module("lab_03")
+    binary = synthetic_binary(side) // 255
+    return lambda: tools.filter_image(binary, 5, 3), side * side
+
+
+def _convolve2d(side, data_dir):
+    tools = load_lab_module("lab_04")
+    image = synthetic_image(side, channels=1)
+    return lambda: tools.convolve2d(image, SCHARR_X), side * side
+
+
+def _apply_scharr(side, data_dir):
+    tools = load_lab_module("lab_04")
+    image = synthetic_image(side, channels=1)
+    return lambda: tools.apply_scharr(image), side * side
+
+
+def _process_image(side, data_dir):
+    main = load_lab_module("lab_05", "main")
+    path = os.path.join(data_dir, f"glyphs_{side}.png")
+    if not os.path.isfile(path):
+        cv2.imwrite(path, synthetic_glyph_page(side))
+    return lambda: main.process_image(path), side * side
+
+
+def _haralick_matrix(side, data_dir):
+    tools = load_lab_module("lab_08")
+    image = synthetic_image(side, channels=1)
+    return lambda: tools.haralick_matrix(image), side * side
+
+
+def _lowpass(streaming):
+    def prepare(duration, data_dir):
+        main = load_lab_module("lab_09", "main")
+        path = synthetic_wav(data_dir, duration)
+        output = os.path.join(data_dir, "lowpass_output.wav")
+        samples = int(round(duration * 44100))
+        return (
+            lambda: main.apply_lowpass_filter(path, output, streaming=streaming),
+            samples,
+        )
+
+    return prepare
+
+
+def _find_formants(duration, data_dir):
+    main = load_lab_module("lab_10", "main")
+    path = synthetic_wav(data_dir, duration)
+    return lambda: main.find_formants(path), int(round(duration * 44100))
+
+
+CASES = [
+    Case("stretch_image", "lab_01", "image", _stretch_image, max_size=512),
+    Case("niblack_binarization", "lab_02", "image", _niblack_binarization),
+    Case("filter_image", "lab_03", "image", _filter_image, max_size=512),
+    Case("convolve2d", "lab_04", "image", _convolve2d, max_size=512),
+    Case("apply_scharr", "lab_04", "image", _apply_scharr, max_size=512),
+    Case("process_image", "lab_05", "image", _process_image),
+    Case("haralick_matrix", "lab_08", "image", _haralick_matrix),
+    Case("apply_lowpass_filter", "lab_09", "audio", _lowpass(False), max_size=600),
+    Case("apply_lowpass_filter_streaming", "lab_09", "audio", _lowpass(True)),
+    Case("find_formants", "lab_10", "audio", _find_formants, max_size=600),
+]
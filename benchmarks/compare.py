@@ -0,0 +1,62 @@
+import argparse
+import json
+import sys
+
+THRESHOLD = 0.10
+# Peak memory below this difference is allocator noise, not a regression.
+MEMORY_SLACK = 1 << 20
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as file:
+        report = json.load(file)
+    return report["environment"], {
+        (result["case"], result["size"]): result for result in report["results"]
+    }
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    rows = []
+    for key in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[key], current[key]
+        speed = new["throughput"] / old["throughput"]
+        regressions = []
+        if speed < 1 - threshold:
+            regressions.append("throughput")
+
+        memory = None
+        if old["peak_bytes"] is not None and new["peak_bytes"] is not None:
+            memory = new["peak_bytes"] / max(old["peak_bytes"], 1)
+            grown = new["peak_bytes"] - old["peak_bytes"]
+            if memory > 1 + threshold and grown > MEMORY_SLACK:
+                regressions.append("memory")
+
+        rows.append((key, speed, memory, regressions))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    old_env, baseline = load_results(args.baseline)
+    new_env, current = load_results(args.current)
+    print(f"baseline: {old_env.get('commit')}  current: {new_env.get('commit')}")
+
+    rows = compare(baseline, current, args.threshold)
+    for (case, size), speed, memory, regressions in rows:
+        memory_text = f"{memory:7.2f}x" if memory is not None else "      -"
+        flag = "REGRESSION: " + ", ".join(regressions) if regressions else ""
+        print(f"{case:32s} {size:>6g} {speed:7.2f}x {memory_text}  {flag}")
+
+    for key in sorted(baseline.keys() ^ current.keys()):
+        print(f"{key[0]:32s} {key[1]:>6g} only in one run")
+
+    return 1 if any(regressions for *_, regressions in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import os
+import wave
+
+import cv2
+import numpy as np
+
+SAMPLE_RATE = 44100
+SEED = 0
+
+
+def synthetic_image(side, channels=3, seed=SEED):
+    # Smooth gradients plus noise and a few shapes, so thresholds and
+    # texture statistics see realistic value ranges instead of pure noise.
+    rng = np.random.default_rng(seed)
+    x = np.arange(side, dtype=np.float32) / side
+    base = 96 + 64 * np.sin(6 * np.pi * x)[None, :] * np.cos(4 * np.pi * x)[:, None]
+
+    # Planes are filled one at a time to keep 8192^2 inputs affordable.
+    image = np.empty((side, side, channels), dtype=np.uint8)
+    for channel in range(channels):
+        plane = rng.standard_normal((side, side), dtype=np.float32)
+        plane *= 20
+        plane += base
+        plane += 32 * channel * x
+        np.clip(plane, 0, 255, out=plane)
+        image[:, :, channel] = plane
+
+    for _ in range(8):
+        center = tuple(int(v) for v in rng.integers(0, side, 2))
+        radius = int(rng.integers(side // 32 + 1, side // 8 + 2))
+        color = tuple(int(v) for v in rng.integers(0, 256, channels))
+        cv2.circle(image, center, radius, color, -1)
+
+    return image if channels > 1 else image[:, :, 0]
+
+
+def synthetic_binary(side, seed=SEED):
+    image = synthetic_image(side, channels=1, seed=seed)
+    return np.where(image > 127, 255, 0).astype(np.uint8)
+
+
+def synthetic_glyph_page(side, seed=SEED):
+    # Dark strokes on white, as lab_05 expects from its letter images.
+    rng = np.random.default_rng(seed)
+    page = np.full((side, side), 255, dtype=np.uint8)
+    step = max(16, side // 16)
+    for top in range(step // 4, side - step, step):
+        for left in range(step // 4, side - step, step):
+            if rng.random() < 0.7:
+                cv2.putText(
+                    page,
+                    chr(int(rng.integers(65, 91))),
+                    (left, top + step * 3 // 4),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    step / 32,
+                    0,
+                    max(1, step // 12),
+                )
+    return page
+
+
+def write_synthetic_wav(path, duration, fs=SAMPLE_RATE, seed=SEED, blocksize=None):
+    # A gliding harmonic tone with noise, written block by block so an hour
+    # of audio never has to exist in memory at once.
+    rng = np.random.default_rng(seed)
+    blocksize = blocksize or fs
+    total = int(round(duration * fs))
+    offset = 0.0
+    with wave.open(path, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(fs)
+        for start in range(0, total, blocksize):
+            t = (start + np.arange(min(blocksize, total - start))) / fs
+            f0 = 140 + 40 * np.sin(2 * np.pi * 0.2 * t)
+            phase = offset + 2 * np.pi * np.cumsum(f0) / fs
+            offset = phase[-1]
+            block = sum(np.sin(k * phase) / k for k in range(1, 8))
+            block += 0.1 * rng.standard_normal(len(t))
+            out.writeframes((block * 6000).astype("<i2").tobytes())
+    return path
+
+
+def synthetic_wav(data_dir, duration, fs=SAMPLE_RATE):
+    path = os.path.join(data_dir, f"synthetic_{duration:g}s_{fs}.wav")
+    if not os.path.isfile(path):
+        write_synthetic_wav(path, duration, fs)
+    return path
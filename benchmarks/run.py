@@ -0,0 +1,157 @@
+import argparse
+import contextlib
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from media_core.labs import ROOT
+
+from cases import CASES
+
+IMAGE_SIZES = (256, 512, 1024, 2048, 4096, 8192)
+AUDIO_DURATIONS = (1, 10, 60, 600, 3600)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def measure(func, repeat, memory):
+    # Labs print progress bars and messages; they are not part of the result.
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            wall, cpu = [], []
+            for _ in range(repeat):
+                gc.collect()
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                func()
+                wall.append(time.perf_counter() - wall_start)
+                cpu.append(time.process_time() - cpu_start)
+
+            # A separate pass, since tracing slows Python-level loops down.
+            peak = None
+            if memory:
+                gc.collect()
+                tracemalloc.start()
+                try:
+                    func()
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+
+    best = int(np.argmin(wall))
+    return wall[best], cpu[best], peak
+
+
+def run_case(case, size, data_dir, repeat, memory):
+    func, items = case.prepare(size, data_dir)
+    seconds, cpu_seconds, peak = measure(func, repeat, memory)
+    return {
+        "case": case.name,
+        "lab": case.lab,
+        "size": size,
+        "unit": case.unit,
+        "items": items,
+        "repeat": repeat,
+        "seconds": seconds,
+        "cpu_seconds": cpu_seconds,
+        "throughput": items / seconds if seconds > 0 else None,
+        "peak_bytes": peak,
+    }
+
+
+def run(cases, sizes, durations, data_dir, repeat=3, memory=True, full=False):
+    results = []
+    for case in cases:
+        for size in sizes if case.kind == "image" else durations:
+            if not full and case.max_size is not None and size > case.max_size:
+                continue
+            result = run_case(case, size, data_dir, repeat, memory)
+            results.append(result)
+
+            peak = result["peak_bytes"]
+            peak_text = f"{peak / 2**20:9.1f} MiB" if peak is not None else ""
+            print(
+                f"{case.name:32s} {size:>6g} {result['seconds']:9.3f} s "
+                f"{result['throughput']:12.4g} {case.unit}/s {peak_text}",
+                flush=True,
+            )
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lab benchmarks")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--cases", nargs="*", help="case names or lab names")
+    parser.add_argument("--sizes", nargs="*", type=int, default=IMAGE_SIZES)
+    parser.add_argument(
+        "--durations", nargs="*", type=float, default=AUDIO_DURATIONS
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument(
+        "--full", action="store_true", help="ignore per-case size limits"
+    )
+    parser.add_argument("--data-dir", help="keep generated inputs here")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cases = [
+        case
+        for case in CASES
+        if not args.cases or case.name in args.cases or case.lab in args.cases
+    ]
+
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir
+        if data_dir is None:
+            data_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(data_dir, exist_ok=True)
+
+        results = run(
+            cases,
+            args.sizes,
+            args.durations,
+            data_dir,
+            repeat=args.repeat,
+            memory=not args.no_memory,
+            full=args.full,
+        )
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"environment": environment(), "results": results}, file, indent=2)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 import numpy as np
-from PIL import Image
+from media_core import image as image_io
 from typing import Any, Optional, NewType
 from tqdm import tqdm
 
@@ -8,16 +8,14 @@ ImageType = NewType("ImageType", np.ndarray[Any, np.dtype[np.uint8]])
 
 def load_image(input_path: str) -> Optional[ImageType]:
     try:
-        image = Image.open(input_path).convert("RGB")
-        return ImageType(np.array(image))
+        return ImageType(image_io.load_image(input_path, "rgb"))
     except Exception as e:
         print(f"Ошибка при загрузке изображения: {e}")
         return None
 
 
 def save_image(image: ImageType, output_path: str) -> None:
-    img = Image.fromarray(image)
-    img.save(output_path)
+    image_io.save_image(image, output_path)
 
 
 def stretch_image(image: ImageType, m: float) -> ImageType:
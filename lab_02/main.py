@@ -1,4 +1,7 @@
 import os
+from typing import Optional
+
+from media_core import trace
 from tools import load_image, niblack_binarization, rgb_to_grayscale, save_image
 
 
@@ -16,15 +19,21 @@ def process_single_image(input_path: str, output_dir: str, window_size: int, k:
 
 
 def process_images_in_folder(
-    input_dir: str, output_dir: str, window_size: int, k: float
+    input_dir: str,
+    output_dir: str,
+    window_size: int,
+    k: float,
+    trace_output: Optional[str] = None,
 ):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    for filename in os.listdir(input_dir):
-        if filename.lower().endswith((".png", ".bmp")):
-            input_path = os.path.join(input_dir, filename)
-            process_single_image(input_path, output_dir, window_size, k)
+    with trace.tracing(trace_output, modules=["tools", __name__]):
+        for filename in os.listdir(input_dir):
+            if filename.lower().endswith((".png", ".bmp")):
+                input_path = os.path.join(input_dir, filename)
+                with trace.stage("image", item=filename):
+                    process_single_image(input_path, output_dir, window_size, k)
 
 
 def get_user_input():
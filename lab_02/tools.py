@@ -1,7 +1,7 @@
 from typing import Any, NewType
 import numpy as np
-from PIL import Image
 import cv2
+from media_core import image as image_io
 
 
 ImageType = NewType("ImageType", np.ndarray[Any, np.dtype[np.uint8]])
@@ -13,16 +13,14 @@ BLUE_WEIGHT = 0.114
 
 def load_image(input_path: str) -> ImageType:
     try:
-        image = Image.open(input_path).convert("RGB")
-        return ImageType(np.array(image))
+        return ImageType(image_io.load_image(input_path, "rgb"))
     except Exception as e:
         print(f"Ошибка при загрузке изображения: {e}")
         raise
 
 
 def save_image(image: ImageType, output_path: str) -> None:
-    img = Image.fromarray(image)
-    img.save(output_path)
+    image_io.save_image(image, output_path)
 
 
 def niblack_binarization(image: ImageType, window_size: int, k: float) -> ImageType:
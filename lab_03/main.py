@@ -1,4 +1,7 @@
 import os
+from typing import Optional
+
+from media_core import trace
 from tools import (
     binarize,
     filter_image,
@@ -23,15 +26,21 @@ def process_single_image(input_path: str, output_dir: str, k: int, aperture_size
 
 
 def process_images_in_folder(
-    input_dir: str, output_dir: str, k: int, aperture_size: int
+    input_dir: str,
+    output_dir: str,
+    k: int,
+    aperture_size: int,
+    trace_output: Optional[str] = None,
 ):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    for filename in os.listdir(input_dir):
-        if filename.lower().endswith((".png", ".bmp")):
-            input_path = os.path.join(input_dir, filename)
-            process_single_image(input_path, output_dir, k, aperture_size)
+    with trace.tracing(trace_output, modules=["tools", __name__]):
+        for filename in os.listdir(input_dir):
+            if filename.lower().endswith((".png", ".bmp")):
+                input_path = os.path.join(input_dir, filename)
+                with trace.stage("image", item=filename):
+                    process_single_image(input_path, output_dir, k, aperture_size)
 
 
 def get_user_input():
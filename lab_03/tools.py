@@ -1,7 +1,7 @@
 from typing import Any, NewType
 import numpy as np
-from PIL import Image
 import cv2
+from media_core import image as image_io
 
 
 ImageType = NewType("ImageType", np.ndarray[Any, np.dtype[np.uint8]])
@@ -15,8 +15,7 @@ def binarize(image: ImageType) -> ImageType:
 
 def load_image(input_path: str) -> ImageType:
     try:
-        image = Image.open(input_path).convert("RGB")
-        return ImageType(np.array(image))
+        return ImageType(image_io.load_image(input_path, "rgb"))
     except Exception as e:
         print(f"Ошибка при загрузке изображения: {e}")
         raise
@@ -61,5 +60,4 @@ def xor(image1: ImageType, image2: ImageType) -> ImageType:
 
 
 def save_image(image: ImageType, output_path: str) -> None:
-    img = Image.fromarray(image)
-    img.save(output_path)
+    image_io.save_image(image, output_path)
@@ -1,4 +1,7 @@
 import os
+from typing import Optional
+
+from media_core import trace
 from tools import (
     apply_scharr,
     load_image,
@@ -38,14 +41,18 @@ def process_single_image(input_path: str, params: Params):
     save_processed_image(scharr_image, "scharr", input_path, params)
 
 
-def process_images_in_folder(input_dir: str, params: Params):
+def process_images_in_folder(
+    input_dir: str, params: Params, trace_output: Optional[str] = None
+):
     if not os.path.exists(params.output_dir):
         os.makedirs(params.output_dir)
 
-    for filename in os.listdir(input_dir):
-        if filename.lower().endswith((".png", ".bmp")):
-            input_path = os.path.join(input_dir, filename)
-            process_single_image(input_path, params)
+    with trace.tracing(trace_output, modules=["tools", __name__]):
+        for filename in os.listdir(input_dir):
+            if filename.lower().endswith((".png", ".bmp")):
+                input_path = os.path.join(input_dir, filename)
+                with trace.stage("image", item=filename):
+                    process_single_image(input_path, params)
 
 
 def main():
@@ -3,8 +3,10 @@ import numpy as np
 import cv2
 import matplotlib.pyplot as plt
 import csv
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Optional
 from tqdm import tqdm
+from media_core import image as image_io
+from media_core import trace
 
 def calculate_mass(binary_img: np.ndarray) -> Tuple[List[int], List[float]]:
     height, width = binary_img.shape
@@ -51,10 +53,15 @@ def save_profile(profile: np.ndarray, filename: str, xlabel: str) -> None:
     plt.savefig(filename)
     plt.close()
 
-def process_image(image_path: str) -> Dict[str, Any]:
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+def binarize_image(img: np.ndarray) -> np.ndarray:
     _, binary_img = cv2.threshold(img, 128, 255, cv2.THRESH_BINARY_INV)
-    
+    return binary_img
+
+def process_image(image_path: str) -> Dict[str, Any]:
+    img = image_io.load_image(image_path, "gray")
+    return process_binary_image(binarize_image(img))
+
+def process_binary_image(binary_img: np.ndarray) -> Dict[str, Any]:
     masses, specific_weights = calculate_mass(binary_img)
     center_of_gravity, normalized_cog = calculate_center_of_gravity(binary_img)
     moments_of_inertia, normalized_moments = calculate_inertia(binary_img)
@@ -71,41 +78,45 @@ def process_image(image_path: str) -> Dict[str, Any]:
         "y_profile": y_profile
     }
 
-def process_directory(root_dir: str, output_dir: str, output_csv: str) -> None:
+def feature_vector(result: Dict[str, Any]) -> List[float]:
+    return [
+        *result["masses"],
+        *result["specific_weights"],
+        *result["center_of_gravity"],
+        *result["normalized_cog"],
+        *result["moments_of_inertia"],
+        *result["normalized_moments"]
+    ]
+
+def process_directory(root_dir: str, output_dir: str, output_csv: str, trace_output: Optional[str] = None) -> None:
     os.makedirs(output_dir, exist_ok=True)
     csv_data = []
     
     folders = [folder for folder in os.listdir(root_dir) if os.path.isdir(os.path.join(root_dir, folder))]
     
-    for folder_name in tqdm(folders, desc="Processing folders"):
-        folder_path = os.path.join(root_dir, folder_name)
-        styles = [style for style in os.listdir(folder_path) if os.path.isdir(os.path.join(folder_path, style))]
-        
-        for style in tqdm(styles, desc=f"Processing styles in {folder_name}", leave=False):
-            style_path = os.path.join(folder_path, style)
-            images = [img for img in os.listdir(style_path) if img.endswith((".png", ".jpg"))]
+    with trace.tracing(trace_output, modules=[__name__]):
+        for folder_name in tqdm(folders, desc="Processing folders"):
+            folder_path = os.path.join(root_dir, folder_name)
+            styles = [style for style in os.listdir(folder_path) if os.path.isdir(os.path.join(folder_path, style))]
             
-            for img_file in tqdm(images, desc=f"Processing images in {style}", leave=False):
-                img_path = os.path.join(style_path, img_file)
-                result = process_image(img_path)
-                
-                csv_row = [
-                    folder_name, style, img_file,
-                    *result["masses"],
-                    *result["specific_weights"],
-                    *result["center_of_gravity"],
-                    *result["normalized_cog"],
-                    *result["moments_of_inertia"],
-                    *result["normalized_moments"]
-                ]
-                csv_data.append(csv_row)
+            for style in tqdm(styles, desc=f"Processing styles in {folder_name}", leave=False):
+                style_path = os.path.join(folder_path, style)
+                images = [img for img in os.listdir(style_path) if img.endswith((".png", ".jpg"))]
                 
-                x_profile_filename = os.path.join(output_dir, f"{folder_name}_{style}_{img_file}_x_profile.png")
-                y_profile_filename = os.path.join(output_dir, f"{folder_name}_{style}_{img_file}_y_profile.png")
-                save_profile(result["x_profile"], x_profile_filename, "X-axis")
-                save_profile(result["y_profile"], y_profile_filename, "Y-axis")
+                for img_file in tqdm(images, desc=f"Processing images in {style}", leave=False):
+                    img_path = os.path.join(style_path, img_file)
+                    with trace.stage("image", item=os.path.join(folder_name, style, img_file)):
+                        result = process_image(img_path)
+                        
+                        csv_row = [folder_name, style, img_file, *feature_vector(result)]
+                        csv_data.append(csv_row)
+                        
+                        x_profile_filename = os.path.join(output_dir, f"{folder_name}_{style}_{img_file}_x_profile.png")
+                        y_profile_filename = os.path.join(output_dir, f"{folder_name}_{style}_{img_file}_y_profile.png")
+                        save_profile(result["x_profile"], x_profile_filename, "X-axis")
+                        save_profile(result["y_profile"], y_profile_filename, "Y-axis")
 
-    save_csv_data(csv_data, output_dir, output_csv)
+        save_csv_data(csv_data, output_dir, output_csv)
 
 def save_csv_data(csv_data: List[List[Any]], output_dir: str, output_csv: str) -> None:
     output_csv_path = os.path.join(output_dir, output_csv)
@@ -121,8 +132,9 @@ def save_csv_data(csv_data: List[List[Any]], output_dir: str, output_csv: str) -
         writer.writerow(header)
         writer.writerows(csv_data)
 
-root_directory = "letter_images"
-output_directory = "output"
-output_csv_file = "features_output.csv"
+if __name__ == "__main__":
+    root_directory = "letter_images"
+    output_directory = "output"
+    output_csv_file = "features_output.csv"
 
-process_directory(root_directory, output_directory, output_csv_file)
+    process_directory(root_directory, output_directory, output_csv_file)
@@ -0,0 +1,114 @@
+import csv
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from main import binarize_image, feature_vector, process_binary_image
+
+FEATURE_COLUMNS = slice(3, 19)
+ALL_FEATURES = list(range(16))
+# feature_vector positions without the centre of gravity (8-11). Generated
+# glyphs are always centred, so its spread is a few pixels and z-scoring
+# turns placement jitter in segmented crops into the dominant distance.
+PLACEMENT_INVARIANT_FEATURES = [0, 1, 2, 3, 4, 5, 6, 7, 12, 13, 14, 15]
+
+
+class GlyphIndex:
+    def __init__(
+        self,
+        features: np.ndarray,
+        labels: List[str],
+        feature_columns: Optional[Sequence[int]] = None,
+    ) -> None:
+        features = np.asarray(features, dtype=np.float32)
+        if features.ndim != 2 or len(features) != len(labels):
+            raise ValueError("Features must be a 2D matrix with one row per label.")
+
+        self.feature_columns = list(
+            ALL_FEATURES if feature_columns is None else feature_columns
+        )
+        selected = features[:, self.feature_columns]
+        self.mean = selected.mean(axis=0)
+        std = selected.std(axis=0)
+        self.std = np.where(std > 0, std, 1).astype(np.float32)
+
+        # Rows are grouped by class so that per-class minima are a single reduceat.
+        classes, class_ids = np.unique(np.asarray(labels), return_inverse=True)
+        order = np.argsort(class_ids, kind="stable")
+        self.classes = classes
+        self.class_starts = np.searchsorted(class_ids[order], np.arange(len(classes)))
+
+        self.matrix = np.ascontiguousarray(self.normalize(features[order]))
+        self.squared_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+
+    @classmethod
+    def from_csv(
+        cls, csv_path: str, feature_columns: Optional[Sequence[int]] = None
+    ) -> "GlyphIndex":
+        labels = []
+        rows = []
+        with open(csv_path, newline="") as file:
+            reader = csv.reader(file, delimiter=";")
+            next(reader)
+            for row in reader:
+                folder, image = row[0], row[2]
+                labels.append(f"{folder}_{image.split('_')[0]}")
+                rows.append(row[FEATURE_COLUMNS])
+        return cls(np.array(rows, dtype=np.float32), labels, feature_columns)
+
+    def normalize(self, features: np.ndarray) -> np.ndarray:
+        features = np.asarray(features, dtype=np.float32)[:, self.feature_columns]
+        return (features - self.mean) / self.std
+
+    def query(
+        self, features: np.ndarray, k: int = 1, batch_size: int = 4096
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        queries = self.normalize(np.atleast_2d(features))
+        k = min(k, len(self.classes))
+
+        labels = np.empty((len(queries), k), dtype=self.classes.dtype)
+        distances = np.empty((len(queries), k), dtype=np.float32)
+
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start : start + batch_size]
+            squared = batch @ self.matrix.T
+            squared *= -2
+            squared += self.squared_norms
+            squared += np.einsum("ij,ij->i", batch, batch)[:, None]
+
+            per_class = np.minimum.reduceat(squared, self.class_starts, axis=1)
+            nearest = np.argpartition(per_class, k - 1, axis=1)[:, :k]
+            nearest_distances = np.take_along_axis(per_class, nearest, axis=1)
+            order = np.argsort(nearest_distances, axis=1)
+
+            stop = start + len(batch)
+            labels[start:stop] = self.classes[np.take_along_axis(nearest, order, axis=1)]
+            distances[start:stop] = np.sqrt(
+                np.maximum(np.take_along_axis(nearest_distances, order, axis=1), 0)
+            )
+
+        return labels, distances
+
+    def query_images(
+        self, binary_images: Iterable[np.ndarray], k: int = 1
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        features = [feature_vector(process_binary_image(img)) for img in binary_images]
+        return self.query(np.array(features, dtype=np.float32).reshape(-1, 16), k)
+
+
+def load_query_images(image_paths: Iterable[str]) -> List[np.ndarray]:
+    return [
+        binarize_image(cv2.imread(path, cv2.IMREAD_GRAYSCALE)) for path in image_paths
+    ]
+
+
+def recognize_images(
+    csv_path: str, image_paths: Iterable[str], k: int = 3
+) -> List[List[Tuple[str, float]]]:
+    index = GlyphIndex.from_csv(csv_path)
+    labels, distances = index.query_images(load_query_images(image_paths), k)
+    return [
+        list(zip(row_labels.tolist(), row_distances.tolist()))
+        for row_labels, row_distances in zip(labels, distances)
+    ]
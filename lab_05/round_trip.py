@@ -0,0 +1,93 @@
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from image_generator import apply_bold, apply_italic_transform, create_image_with_text
+from main import binarize_image, feature_vector, process_binary_image
+from recognition import PLACEMENT_INVARIANT_FEATURES, GlyphIndex
+from segmentation import recognize_page
+
+FONT_SIZES = [120, 150, 180]
+
+
+def to_binary(image: Image.Image) -> np.ndarray:
+    # Same pixels cv2.imread(..., IMREAD_GRAYSCALE) sees in the saved PNGs.
+    gray = cv2.cvtColor(np.asarray(image)[:, :, :3], cv2.COLOR_RGB2GRAY)
+    return binarize_image(gray)
+
+
+def build_index(alphabet: List[str], case_label: str, font_path: str) -> GlyphIndex:
+    features, labels = [], []
+    for i, letter in enumerate(alphabet):
+        for size in FONT_SIZES:
+            font = ImageFont.truetype(font_path, size)
+            for image in (
+                create_image_with_text(letter, font),
+                create_image_with_text(letter, font, style_func=apply_bold),
+                create_image_with_text(
+                    letter, font, transform_func=apply_italic_transform
+                ),
+            ):
+                features.append(feature_vector(process_binary_image(to_binary(image))))
+                labels.append(f"{case_label}_{i + 1:02}")
+    return GlyphIndex(
+        np.array(features, dtype=np.float32), labels, PLACEMENT_INVARIANT_FEATURES
+    )
+
+
+def render_page(
+    alphabet: List[str], font_path: str, font_size: int, per_line: int = 8
+) -> Image.Image:
+    font = ImageFont.truetype(font_path, font_size)
+    step = font_size * 3 // 2
+    rows = (len(alphabet) + per_line - 1) // per_line
+    page = Image.new("RGBA", (step * per_line, step * rows), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(page)
+    for i, letter in enumerate(alphabet):
+        row, column = divmod(i, per_line)
+        position = (column * step + step // 4, row * step)
+        draw.text(position, letter, font=font, fill="black")
+    return page
+
+
+def round_trip(
+    alphabet: List[str], case_label: str, font_path: str, font_size: int = 150
+) -> Tuple[int, int]:
+    index = build_index(alphabet, case_label, font_path)
+    page = to_binary(render_page(alphabet, font_path, font_size))
+    line_gap = font_size // 4
+    _, labels, _ = recognize_page(
+        index,
+        page,
+        scale=FONT_SIZES[1] / font_size,
+        line_gap=line_gap,
+        char_gap=line_gap,
+    )
+
+    expected = [f"{case_label}_{i + 1:02}" for i in range(len(alphabet))]
+    found = labels[:, 0].tolist()
+    if len(found) != len(expected):
+        return 0, len(expected)
+    return sum(a == b for a, b in zip(found, expected)), len(expected)
+
+
+def main():
+    osmanya_alphabet: List[str] = [chr(i) for i in range(0x10480, 0x104AA)]
+    georgian_alphabet: List[str] = list("აბგდევზთიკლმნოპჟრსტუფქღყშჩცძწჭხჯჰ")
+
+    for alphabet, case_label, font_path in (
+        (osmanya_alphabet, "osmanya", "./osmanya-regular.ttf"),
+        (georgian_alphabet, "georgian", "./georgian-regular.ttf"),
+    ):
+        for font_size in (150, 75):
+            correct, total = round_trip(alphabet, case_label, font_path, font_size)
+            print(
+                f"{case_label}, размер шрифта {font_size}: "
+                f"распознано {correct} из {total}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from main import calculate_profiles, feature_vector, process_binary_image
+from recognition import GlyphIndex
+
+BoxType = Tuple[int, int, int, int]
+
+# image_generator.py renders every training glyph centred on this canvas.
+CANVAS_SIZE = 200
+
+
+def find_runs(profile: np.ndarray, threshold: int = 0, min_gap: int = 1) -> np.ndarray:
+    mask = np.concatenate(([False], profile > threshold, [False]))
+    edges = np.flatnonzero(mask[1:] != mask[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+
+    if min_gap > 1 and len(starts) > 1:
+        keep = (starts[1:] - ends[:-1]) >= min_gap
+        starts = starts[np.concatenate(([True], keep))]
+        ends = ends[np.concatenate((keep, [True]))]
+
+    return np.stack((starts, ends), axis=1)
+
+
+def segment_lines(
+    binary_img: np.ndarray, threshold: int = 0, min_gap: int = 1
+) -> np.ndarray:
+    _, y_profile = calculate_profiles(binary_img)
+    return find_runs(y_profile, threshold, min_gap)
+
+
+def segment_characters(
+    binary_line: np.ndarray, threshold: int = 0, min_gap: int = 1
+) -> np.ndarray:
+    x_profile, _ = calculate_profiles(binary_line)
+    return find_runs(x_profile, threshold, min_gap)
+
+
+def segment_page(
+    binary_img: np.ndarray,
+    line_gap: int = 1,
+    char_gap: int = 1,
+    threshold: int = 0,
+) -> List[BoxType]:
+    boxes = []
+    for top, bottom in segment_lines(binary_img, threshold, line_gap):
+        line = binary_img[top:bottom]
+        for left, right in segment_characters(line, threshold, char_gap):
+            # Trim each glyph to its own rows: the line band also covers
+            # ascenders and descenders of its neighbours.
+            rows = np.flatnonzero((line[:, left:right] == 255).any(axis=1))
+            if len(rows) == 0:
+                continue
+            y = int(top + rows[0])
+            boxes.append((int(left), y, int(right - left), int(rows[-1] - rows[0] + 1)))
+    return boxes
+
+
+def crop_boxes(binary_img: np.ndarray, boxes: List[BoxType]) -> List[np.ndarray]:
+    return [binary_img[y : y + h, x : x + w] for x, y, w, h in boxes]
+
+
+def place_on_canvas(
+    crop: np.ndarray, scale: float = 1.0, canvas_size: int = CANVAS_SIZE
+) -> np.ndarray:
+    # Most features are absolute pixel quantities (quarter masses, centre of
+    # gravity, inertia sums), so a crop is only comparable with the training
+    # rows once it sits centred on the same canvas at the same glyph size.
+    height, width = crop.shape
+    scale = min(scale, canvas_size / max(height, width))
+    if scale != 1.0:
+        width = max(1, int(round(width * scale)))
+        height = max(1, int(round(height * scale)))
+        crop = cv2.resize(crop, (width, height), interpolation=cv2.INTER_NEAREST)
+
+    canvas = np.zeros((canvas_size, canvas_size), dtype=np.uint8)
+    top = (canvas_size - height) // 2
+    left = (canvas_size - width) // 2
+    canvas[top : top + height, left : left + width] = crop
+    return canvas
+
+
+def page_features(
+    binary_img: np.ndarray, scale: float = 1.0, **segment_kwargs
+) -> Tuple[List[BoxType], np.ndarray]:
+    boxes = segment_page(binary_img, **segment_kwargs)
+    features = np.array(
+        [
+            feature_vector(process_binary_image(place_on_canvas(crop, scale)))
+            for crop in crop_boxes(binary_img, boxes)
+        ],
+        dtype=np.float32,
+    ).reshape(-1, 16)
+    return boxes, features
+
+
+def recognize_page(
+    index: GlyphIndex,
+    binary_img: np.ndarray,
+    k: int = 1,
+    scale: float = 1.0,
+    **segment_kwargs,
+) -> Tuple[List[BoxType], np.ndarray, np.ndarray]:
+    # scale is the training font size over the page font size.
+    boxes, features = page_features(binary_img, scale, **segment_kwargs)
+    labels, distances = index.query(features, k)
+    return boxes, labels, distances
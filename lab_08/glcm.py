@@ -0,0 +1,349 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+LEVELS = 256
+CHUNK_PIXELS = 1 << 22
+MAP_LEVELS = 16
+STRIP_ROWS = 128
+
+FEATURES = (
+    "contrast",
+    "dissimilarity",
+    "homogeneity",
+    "ASM",
+    "energy",
+    "entropy",
+    "correlation",
+    "mean",
+    "variance",
+    "cluster_shade",
+    "cluster_prominence",
+)
+
+
+def quantize(image: np.ndarray, levels: int = LEVELS) -> np.ndarray:
+    if levels == LEVELS:
+        return image
+    if not 2 <= levels <= LEVELS:
+        raise ValueError(f"Unsupported number of gray levels: {levels}")
+
+    return ((image.astype(np.uint16) * levels) >> 8).astype(np.uint8)
+
+
+def _round(value: float) -> int:
+    # Same rounding as skimage's _glcm_loop (C round, half away from zero).
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+def pixel_offset(distance: float, angle: float) -> Tuple[int, int]:
+    return _round(math.sin(angle) * distance), _round(math.cos(angle) * distance)
+
+
+def count_pairs(image: np.ndarray, offset: Tuple[int, int], levels: int) -> np.ndarray:
+    offset_row, offset_col = offset
+    rows, cols = image.shape
+
+    row_start, row_stop = max(0, -offset_row), min(rows, rows - offset_row)
+    col_start, col_stop = max(0, -offset_col), min(cols, cols - offset_col)
+
+    counts = np.zeros(levels * levels, dtype=np.int64)
+    if row_stop <= row_start or col_stop <= col_start:
+        return counts.reshape(levels, levels)
+
+    # Row chunks keep the flattened pair indices to a bounded size.
+    chunk_rows = max(1, CHUNK_PIXELS // (col_stop - col_start))
+    for start in range(row_start, row_stop, chunk_rows):
+        stop = min(start + chunk_rows, row_stop)
+        first = image[start:stop, col_start:col_stop]
+        second = image[
+            start + offset_row : stop + offset_row,
+            col_start + offset_col : col_stop + offset_col,
+        ]
+        pairs = first.astype(np.intp)
+        pairs *= levels
+        pairs += second
+        counts += np.bincount(pairs.ravel(), minlength=levels * levels)
+
+    return counts.reshape(levels, levels)
+
+
+def graycomatrix(
+    image: np.ndarray,
+    distances: Sequence[float],
+    angles: Sequence[float],
+    levels: int = LEVELS,
+    symmetric: bool = False,
+    normed: bool = False,
+) -> np.ndarray:
+    image = np.ascontiguousarray(image)
+    if image.ndim != 2:
+        raise ValueError("Image must be a 2D array.")
+    if np.issubdtype(image.dtype, np.floating):
+        raise ValueError("Float images are not supported.")
+    if image.size and image.max() >= levels:
+        raise ValueError("Image values must be smaller than the number of levels.")
+
+    dtype = np.float64 if normed else np.uint32
+    glcm = np.empty((levels, levels, len(distances), len(angles)), dtype=dtype)
+
+    # An offset and its negation count the same pairs with i and j swapped,
+    # so only one of them is counted and the other is a transposed view.
+    unique: Dict[Tuple[int, int], np.ndarray] = {}
+    for d_idx, distance in enumerate(distances):
+        for a_idx, angle in enumerate(angles):
+            offset = pixel_offset(distance, angle)
+            mirrored = (-offset[0], -offset[1])
+
+            if offset in unique:
+                matrix = unique[offset]
+            elif mirrored in unique:
+                matrix = unique[mirrored].T
+            else:
+                matrix = count_pairs(image, offset, levels)
+                if symmetric:
+                    matrix = matrix + matrix.T
+                if normed:
+                    total = matrix.sum()
+                    matrix = matrix / (total if total else 1)
+                unique[offset] = matrix
+
+            glcm[:, :, d_idx, a_idx] = matrix
+
+    return glcm
+
+
+def rebin(glcm: np.ndarray, mapping: np.ndarray, levels: int = LEVELS) -> np.ndarray:
+    # Pixelwise gray-level mappings move every pair (i, j) to (map[i], map[j]),
+    # so the GLCM of the mapped image is a re-binning of the original one.
+    source_levels = glcm.shape[0]
+    mapping = np.asarray(mapping, dtype=np.intp)
+    if mapping.shape != (source_levels,):
+        raise ValueError("Mapping must have one entry per source gray level.")
+
+    pairs = (mapping[:, None] * levels + mapping[None, :]).ravel()
+    flat = glcm.reshape(source_levels * source_levels, -1)
+
+    rebinned = np.empty((levels * levels, flat.shape[1]), dtype=np.float64)
+    for idx in range(flat.shape[1]):
+        rebinned[:, idx] = np.bincount(
+            pairs, weights=flat[:, idx], minlength=levels * levels
+        )
+
+    return rebinned.reshape(levels, levels, *glcm.shape[2:])
+
+
+def normalize(glcm: np.ndarray) -> np.ndarray:
+    glcm = glcm.astype(np.float64)
+    sums = glcm.sum(axis=(0, 1), keepdims=True)
+    sums[sums == 0] = 1
+    glcm /= sums
+    return glcm
+
+
+@lru_cache(maxsize=8)
+def _weight_grids(levels: int) -> Tuple[Dict[str, int], np.ndarray]:
+    i, j = np.indices((levels, levels), dtype=np.float64)
+    i, j = i.ravel(), j.ravel()
+    diff = i - j
+    total = i + j
+
+    weights = np.stack(
+        (
+            diff**2,
+            np.abs(diff),
+            1.0 / (1.0 + diff**2),
+            i,
+            j,
+            i**2,
+            j**2,
+            i * j,
+            total**2,
+            total**3,
+            total**4,
+        )
+    )
+    weights.setflags(write=False)
+    names = (
+        "contrast",
+        "dissimilarity",
+        "homogeneity",
+        "i",
+        "j",
+        "i2",
+        "j2",
+        "ij",
+        "s2",
+        "s3",
+        "s4",
+    )
+    return dict(zip(names, range(len(names)))), weights
+
+
+def _entropy(P: np.ndarray) -> np.ndarray:
+    # Row blocks keep the log temporary bounded instead of a full copy of P.
+    entropy = np.zeros(P.shape[1], dtype=np.float64)
+    block_rows = max(1, CHUNK_PIXELS // (4 * P.shape[1]))
+    for start in range(0, P.shape[0], block_rows):
+        block = P[start : start + block_rows]
+        logs = np.log(block, where=block != 0, out=np.zeros_like(block))
+        entropy -= np.einsum("ij,ij->j", block, logs)
+    return entropy
+
+
+def texture_features(
+    glcm: np.ndarray, props: Sequence[str] = FEATURES, inplace: bool = False
+) -> Dict[str, np.ndarray]:
+    unknown = set(props) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown texture features: {sorted(unknown)}")
+
+    levels = glcm.shape[0]
+    if glcm.shape[1] != levels:
+        raise ValueError("GLCM must be square in its first two axes.")
+
+    batch_shape = glcm.shape[2:]
+    P = glcm.reshape(levels * levels, -1)
+    if not inplace or P.dtype != np.float64 or not np.shares_memory(P, glcm):
+        P = P.astype(np.float64)
+    sums = P.sum(axis=0)
+    sums[sums == 0] = 1
+    P /= sums
+
+    # One matrix product gives every moment the linear features need.
+    index, weights = _weight_grids(levels)
+    moments = weights @ P
+
+    mean_i, mean_j = moments[index["i"]], moments[index["j"]]
+    var_i = np.maximum(moments[index["i2"]] - mean_i**2, 0)
+    var_j = np.maximum(moments[index["j2"]] - mean_j**2, 0)
+
+    results = {}
+    for prop in props:
+        if prop in ("contrast", "dissimilarity", "homogeneity"):
+            value = moments[index[prop]]
+        elif prop == "ASM":
+            value = np.einsum("ij,ij->j", P, P)
+        elif prop == "energy":
+            value = np.sqrt(results.get("ASM", np.einsum("ij,ij->j", P, P)))
+        elif prop == "entropy":
+            value = _entropy(P)
+        elif prop == "correlation":
+            std = np.sqrt(var_i * var_j)
+            cov = moments[index["ij"]] - mean_i * mean_j
+            flat = std < 1e-15
+            value = np.where(flat, 1.0, cov / np.where(flat, 1.0, std))
+        elif prop == "mean":
+            value = mean_i
+        elif prop == "variance":
+            value = var_i
+        else:
+            # Central moments of (i + j) expanded from raw ones; E[i + j] = m.
+            m = mean_i + mean_j
+            s2, s3 = moments[index["s2"]], moments[index["s3"]]
+            if prop == "cluster_shade":
+                value = s3 - 3 * m * s2 + 2 * m**3
+            else:
+                s4 = moments[index["s4"]]
+                value = s4 - 4 * m * s3 + 6 * m**2 * s2 - 3 * m**4
+        results[prop] = value.reshape(batch_shape)
+
+    return results
+
+
+def save_texture_features(
+    features: Dict[str, np.ndarray], output_path: str, **columns
+) -> None:
+    np.savez_compressed(output_path, **columns, **features)
+
+
+def _texture_strip(
+    strip: np.ndarray, window_size: int, offset: Tuple[int, int], levels: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    offset_row, offset_col = offset
+    height, width = strip.shape
+    out_rows, out_cols = height - window_size + 1, width - window_size + 1
+    bins = levels * levels
+
+    # pairs[x, k] is the pair index of the pixel at column x and strip row
+    # k + max(0, -dr); columns go first so each slide reads contiguous memory.
+    row_start, row_stop = max(0, -offset_row), height - max(0, offset_row)
+    first = strip[row_start:row_stop, : width - offset_col]
+    second = strip[row_start + offset_row : row_stop + offset_row, offset_col:]
+    pairs = np.ascontiguousarray((first.astype(np.intp) * levels + second).T)
+
+    pair_rows = window_size - abs(offset_row)
+    pair_cols = window_size - offset_col
+    window_rows = np.arange(out_rows)[:, None] + np.arange(pair_rows)
+    window_bins = (np.arange(out_rows) * bins)[:, None]
+
+    def column_counts(column: int) -> np.ndarray:
+        flat = pairs[column][window_rows] + window_bins
+        counts = np.bincount(flat.ravel(), minlength=out_rows * bins)
+        return counts.reshape(out_rows, bins)
+
+    index, weights = _weight_grids(levels)
+    weights = weights[[index["contrast"], index["homogeneity"]]].T
+
+    # Per-column counts are kept until they leave the window, so each pair
+    # column is counted exactly once.
+    entered = [column_counts(column) for column in range(pair_cols)]
+    hist = sum(entered)
+    maps = np.empty((out_cols, out_rows, 2), dtype=np.float64)
+    for column in range(out_cols):
+        maps[column] = hist @ weights
+        if column + 1 < out_cols:
+            entering = column_counts(column + pair_cols)
+            hist += entering
+            hist -= entered[column % pair_cols]
+            entered[column % pair_cols] = entering
+
+    maps /= pair_rows * pair_cols
+    return maps[:, :, 0].T.astype(np.float32), maps[:, :, 1].T.astype(np.float32)
+
+
+def texture_maps(
+    image: np.ndarray,
+    window_size: int = 7,
+    distance: float = 1,
+    angle: float = 0.0,
+    levels: int = MAP_LEVELS,
+    strip_rows: int = STRIP_ROWS,
+    workers: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    if image.ndim != 2:
+        raise ValueError("Image must be a 2D array.")
+    if window_size % 2 == 0:
+        raise ValueError("Window size must be odd.")
+
+    # Contrast and homogeneity do not change under i <-> j, so the offset is
+    # flipped to point right (or down) and windows slide left to right.
+    offset_row, offset_col = pixel_offset(distance, angle)
+    if offset_col < 0 or (offset_col == 0 and offset_row < 0):
+        offset_row, offset_col = -offset_row, -offset_col
+    if abs(offset_row) >= window_size or offset_col >= window_size:
+        raise ValueError("Offset does not fit into the window.")
+
+    half = window_size // 2
+    padded = np.pad(quantize(image, levels), half, mode="reflect")
+
+    rows = image.shape[0]
+    strips = [
+        padded[start : min(start + strip_rows, rows) + 2 * half]
+        for start in range(0, rows, strip_rows)
+    ]
+    args = (window_size, (offset_row, offset_col), levels)
+
+    if workers is not None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_texture_strip, strip, *args) for strip in strips]
+            results = [future.result() for future in futures]
+    else:
+        results = [_texture_strip(strip, *args) for strip in strips]
+
+    contrast_map = np.concatenate([result[0] for result in results])
+    homogeneity_map = np.concatenate([result[1] for result in results])
+    return contrast_map, homogeneity_map
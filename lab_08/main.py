@@ -1,47 +1,151 @@
 import os
+from typing import Optional
 
-from tools import (contrast, gamma_correction, grayscale, haralick_matrix,
-                   load_image, local, save_glcm_images, save_image,
-                   save_metrics_to_file)
+import numpy as np
+from media_core import trace
 
+from glcm import save_texture_features, texture_features
+from tools import (contrast, gamma_correction, gamma_haralick_matrices,
+                   grayscale, haralick_matrix, load_image, local,
+                   save_glcm_archive, save_glcm_heatmaps, save_glcm_images,
+                   save_image, save_metrics_to_file)
 
-def process_image(input_image, output_dir, filename, gamma_value: float):
-    gamma_image = gamma_correction(input_image, gamma_value)
-    gray_image = grayscale(gamma_image)
+GAMMA_VALUES = [1.0, 0.5, 1.5]
+
+
+def process_image(
+    gray_image,
+    output_dir,
+    filename,
+    gamma_value: float,
+    glcm=None,
+    text_output: bool = False,
+):
     grayscale_path = os.path.join(output_dir, f"{filename}_grayscale_{gamma_value}.png")
     save_image(gray_image, grayscale_path)
 
-    glcm = haralick_matrix(gray_image)
-    save_glcm_images(glcm, output_dir, f"{filename}_{gamma_value}")
+    if glcm is None:
+        glcm = haralick_matrix(gray_image)
 
-    metrics = {
-        "Контраст (contrast)": contrast(glcm),
-        "Локальная однородность (local uniformity)": local(glcm),
-    }
-    
-    save_metrics_to_file(metrics, output_dir, f"{filename}_{gamma_value}")
+    metrics = {"contrast": contrast(glcm), "homogeneity": local(glcm)}
+
+    if text_output:
+        save_glcm_images(glcm, output_dir, f"{filename}_{gamma_value}")
+        text_metrics = {
+            "Контраст (contrast)": metrics["contrast"],
+            "Локальная однородность (local uniformity)": metrics["homogeneity"],
+        }
+        save_metrics_to_file(text_metrics, output_dir, f"{filename}_{gamma_value}")
+    else:
+        save_glcm_heatmaps(glcm, output_dir, f"{filename}_{gamma_value}")
+
+    return glcm, metrics
 
 
-def process_single_image(input_path: str, output_dir: str):
+def process_single_image(
+    input_path: str,
+    output_dir: str,
+    multi_gamma: bool = True,
+    text_output: bool = False,
+    memmap: bool = False,
+):
     filename = os.path.basename(input_path)
     input_image = load_image(input_path)
 
     input_image_path = os.path.join(output_dir, f"{filename}_input.png")
     save_image(input_image, input_image_path)
 
-    gamma_values = [1.0, 0.5, 1.5]
-    for gamma_value in gamma_values:
-        process_image(input_image, output_dir, filename, gamma_value)
+    gray_images = {
+        gamma_value: grayscale(gamma_correction(input_image, gamma_value))
+        for gamma_value in GAMMA_VALUES
+    }
+    glcms = {}
+    if multi_gamma:
+        glcms = gamma_haralick_matrices(
+            input_image, GAMMA_VALUES, gray_images=gray_images
+        )
+    metrics = {}
+    for gamma_value in GAMMA_VALUES:
+        glcms[gamma_value], metrics[gamma_value] = process_image(
+            gray_images.pop(gamma_value),
+            output_dir,
+            filename,
+            gamma_value,
+            glcms.get(gamma_value),
+            text_output,
+        )
+
+    save_glcm_archive(glcms, metrics, output_dir, filename, memmap)
+
+
+def process_images_in_folder(
+    input_dir: str,
+    output_dir: str,
+    text_output: bool = False,
+    memmap: bool = False,
+    trace_output: Optional[str] = None,
+):
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    with trace.tracing(trace_output, modules=["tools", "glcm", __name__]):
+        for filename in os.listdir(input_dir):
+            if filename.lower().endswith((".png", ".bmp")):
+                input_path = os.path.join(input_dir, filename)
+                with trace.stage("image", item=filename):
+                    process_single_image(
+                        input_path, output_dir, text_output=text_output, memmap=memmap
+                    )
+
+
+def save_texture_batch(features, filenames, output_dir, batch_idx):
+    columns = {
+        name: np.stack([item[name] for item in features], axis=-1)
+        for name in features[0]
+    }
+    output_path = os.path.join(output_dir, f"texture_features_{batch_idx:04d}.npz")
+    save_texture_features(
+        columns,
+        output_path,
+        images=np.array(filenames),
+        gammas=np.array(GAMMA_VALUES),
+    )
+
+
+def image_texture_features(input_image):
+    # Each GLCM is reduced to its features as soon as it exists, so a batch
+    # only ever holds the small feature columns, not 256x256 matrices.
+    gamma_glcms = gamma_haralick_matrices(input_image, GAMMA_VALUES)
+    per_gamma = [
+        texture_features(gamma_glcms.pop(gamma), inplace=True)
+        for gamma in GAMMA_VALUES
+    ]
+    return {
+        name: np.stack([item[name] for item in per_gamma], axis=-1)
+        for name in per_gamma[0]
+    }
 
 
-def process_images_in_folder(input_dir: str, output_dir: str):
+def process_texture_batch(input_dir: str, output_dir: str, batch_size: int = 256):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    for filename in os.listdir(input_dir):
-        if filename.lower().endswith((".png", ".bmp")):
-            input_path = os.path.join(input_dir, filename)
-            process_single_image(input_path, output_dir)
+    filenames = [
+        filename
+        for filename in sorted(os.listdir(input_dir))
+        if filename.lower().endswith((".png", ".bmp"))
+    ]
+
+    # Images of one size are decoded into the same buffer; the features are
+    # extracted before the next decode overwrites it.
+    image = None
+    for batch_idx, start in enumerate(range(0, len(filenames), batch_size)):
+        batch = filenames[start : start + batch_size]
+        features = []
+        for filename in batch:
+            image = load_image(os.path.join(input_dir, filename), out=image)
+            features.append(image_texture_features(image))
+        save_texture_batch(features, batch, output_dir, batch_idx)
 
 
 def get_user_input():
@@ -55,6 +159,7 @@ def main():
         print("\nМеню:")
         print("1. Обработать одно изображение")
         print("2. Обработать все изображения в папке")
+        print("3. Рассчитать текстурные признаки для всех изображений в папке")
         print("0. Выход")
 
         choice = input("Выберите пункт меню: ")
@@ -71,6 +176,13 @@ def main():
             output_dir = get_user_input()
             process_images_in_folder(input_dir, output_dir)
 
+        elif choice == "3":
+            input_dir = input(
+                "Введите путь к папке с изображениями (формат bmp или png): "
+            )
+            output_dir = get_user_input()
+            process_texture_batch(input_dir, output_dir)
+
         elif choice == "0":
             print("Выход из программы.")
             break
@@ -1,13 +1,18 @@
 import os
-from typing import Any, NewType
+from functools import lru_cache
+from typing import Any, NewType, Optional
 
+import cv2
 import matplotlib.pyplot as plt
 import numpy as np
-from PIL import Image
-from skimage import feature, io, color
+from media_core import image as image_io
+from skimage import color, feature
+
+from glcm import LEVELS, graycomatrix, normalize, quantize, rebin
 
 DISTANCE = 2
 ANGLES = [0, np.pi / 2, np.pi, 3 * np.pi / 2]
+ANGLE_DEGREES = [0, 90, 180, 270]
 
 ImageType = NewType("ImageType", np.ndarray[Any, np.dtype[np.uint8]])
 
@@ -22,9 +27,11 @@ def grayscale(image: ImageType) -> ImageType:
     return gray_image
 
 
-def load_image(input_path: str) -> np.ndarray:
+def load_image(input_path: str, out: Optional[np.ndarray] = None) -> np.ndarray:
     try:
-        image = io.imread(input_path)
+        # Like skimage.io.imread for RGB(A), palette and 2D images, except
+        # that gray+alpha comes out as RGBA and 1-bit images as 0/255 uint8.
+        image = image_io.load_image(input_path, "unchanged", out)
         return image
     except Exception as e:
         print(f"Error loading image: {e}")
@@ -39,7 +46,23 @@ def local(glcm):
     return feature.graycoprops(glcm, prop="homogeneity")
 
 
-def gamma_correction(image: ImageType, gamma: float) -> ImageType:
+@lru_cache(maxsize=32)
+def gamma_lut(gamma: float) -> np.ndarray:
+    levels = np.arange(256) / 255.0
+    lut = (np.power(levels, gamma) * 255).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+
+def gamma_correction(
+    image: ImageType, gamma: float, inplace: bool = False
+) -> ImageType:
+    if image.dtype == np.uint8:
+        out = image if inplace else None
+        if image.ndim in (2, 3):
+            return cv2.LUT(image, gamma_lut(gamma), dst=out)
+        return np.take(gamma_lut(gamma), image, out=out, mode="clip")
+
     image_normalized = image / 255.0
     corrected_image = np.power(image_normalized, gamma)
     corrected_image = (corrected_image * 255).astype(np.uint8)
@@ -54,17 +77,55 @@ def save_metrics_to_file(metrics: dict, output_dir: str, filename: str) -> None:
             f.write(f"{key}: {value}\n")
 
 
-def haralick_matrix(image: ImageType, distance=DISTANCE, angles=ANGLES):
-    glcm = feature.graycomatrix(
-        image, distances=[distance], angles=angles, symmetric=True, normed=True
+def haralick_matrix(
+    image: ImageType, distance=DISTANCE, angles=ANGLES, levels: int = LEVELS
+):
+    glcm = graycomatrix(
+        quantize(image, levels),
+        distances=[distance],
+        angles=angles,
+        levels=levels,
+        symmetric=True,
+        normed=True,
     )
-    glcm_log = np.log1p(glcm)
+    glcm_log = np.log1p(glcm, out=glcm)
 
     return glcm_log
 
 
+def gamma_haralick_matrices(
+    image: ImageType,
+    gamma_values,
+    distance=DISTANCE,
+    angles=ANGLES,
+    levels: int = LEVELS,
+    gray_images: Optional[dict] = None,
+) -> dict:
+    # Gamma before rgb2gray is not a gray-level mapping of the gray image,
+    # so colour input needs one GLCM per gamma-corrected gray image; callers
+    # that already have those images pass them in.
+    if image.ndim != 2 or image.dtype != np.uint8:
+        glcms = {}
+        for gamma in gamma_values:
+            if gray_images is not None:
+                gray_image = gray_images[gamma]
+            else:
+                gray_image = grayscale(gamma_correction(image, gamma))
+            glcms[gamma] = haralick_matrix(gray_image, distance, angles, levels)
+        return glcms
+
+    base = graycomatrix(image, distances=[distance], angles=angles, symmetric=True)
+
+    glcms = {}
+    for gamma in gamma_values:
+        glcm = normalize(rebin(base, quantize(gamma_lut(gamma), levels), levels))
+        glcms[gamma] = np.log1p(glcm, out=glcm)
+
+    return glcms
+
+
 def save_glcm_images(glcm: np.ndarray, output_dir: str, filename: str) -> None:
-    for idx, angle in enumerate([0, 90, 180, 270]):
+    for idx, angle in enumerate(ANGLE_DEGREES):
         glcm_angle = glcm[:, :, 0, idx]
 
         glcm_file = os.path.join(output_dir, f"{filename}_glcm_{angle}deg.txt")
@@ -78,6 +139,53 @@ def save_glcm_images(glcm: np.ndarray, output_dir: str, filename: str) -> None:
         plt.close()
 
 
+@lru_cache(maxsize=8)
+def colormap_lut(cmap: str) -> np.ndarray:
+    lut = (plt.get_cmap(cmap)(np.arange(256))[:, :3] * 255).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+
+def save_glcm_heatmaps(
+    glcm: np.ndarray, output_dir: str, filename: str, cmap: str = "grey"
+) -> None:
+    lut = colormap_lut(cmap)
+    for idx, angle in enumerate(ANGLE_DEGREES):
+        glcm_angle = glcm[:, :, 0, idx]
+        peak = glcm_angle.max()
+        scale = 255 / peak if peak > 0 else 0
+        indices = (glcm_angle * scale).astype(np.uint8)
+
+        glcm_img_path = os.path.join(output_dir, f"{filename}_glcm_{angle}deg.png")
+        save_image(lut[indices], glcm_img_path)
+
+
+def save_glcm_archive(
+    glcms: dict,
+    metrics: dict,
+    output_dir: str,
+    filename: str,
+    memmap: bool = False,
+) -> None:
+    gamma_values = list(glcms)
+    arrays = {
+        "gammas": np.array(gamma_values),
+        "angles": np.array(ANGLE_DEGREES),
+        **{
+            name: np.stack([metrics[gamma][name] for gamma in gamma_values], axis=-1)
+            for name in next(iter(metrics.values()))
+        },
+    }
+    glcm = np.stack([glcms[gamma] for gamma in gamma_values], axis=-1)
+
+    if memmap:
+        np.save(os.path.join(output_dir, f"{filename}_glcm.npy"), glcm)
+        np.savez(os.path.join(output_dir, f"{filename}_metrics.npz"), **arrays)
+    else:
+        np.savez_compressed(
+            os.path.join(output_dir, f"{filename}_glcm.npz"), glcm=glcm, **arrays
+        )
+
+
 def save_image(image: ImageType, output_path: str) -> None:
-    img = Image.fromarray(image)
-    img.save(output_path)
+    image_io.save_image(image, output_path)
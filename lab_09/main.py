@@ -1,37 +1,28 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from media_core.session import AnalysisSession, as_session
+from media_core.spectrogram import render_spectrogram
 from scipy.io import wavfile
-from scipy.signal import spectrogram, butter, lfilter, savgol_filter
-from scipy.signal.windows import hann
+from scipy.signal import butter, lfilter, savgol_filter
 
-def plot_spectrogram(filename, output_image):
-    fs, data = wavfile.read(filename)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
+from streaming import debounce_times, stream_lowpass_filter, stream_savgol_filter
+
+def plot_spectrogram(source, output_image):
+    session = as_session(source)
+    fs = session.fs
 
     nperseg = 1024
     noverlap = nperseg // 2
-    window = hann(nperseg)
-
-    f, t, Sxx = spectrogram(data, fs, window=window, nperseg=nperseg, noverlap=noverlap, scaling='density', mode='magnitude')
 
-    Sxx_db = 10 * np.log10(Sxx + 1e-10)
+    f, t, Sxx = session.spectrogram(nperseg, noverlap, 'hann')
 
-    plt.figure(figsize=(10, 6))
-    plt.pcolormesh(t, f, Sxx_db, shading='gouraud', cmap='magma')
-    plt.yscale('log')
-    plt.colorbar(label='Уровень (дБ)')
-    plt.ylabel('Частота [Гц]')
-    plt.xlabel('Время [с]')
-    plt.title('Спектрограмма')
-    plt.ylim([20, fs / 2])
-    plt.savefig(output_image)
-    plt.close()
+    render_spectrogram(f, t, Sxx, output_image, fmin=20, fmax=fs / 2, cmap='magma', title='Спектрограмма')
 
-def apply_savgol_filter(input_file, output_file, window_length=51, polyorder=3):
-    fs, data = wavfile.read(input_file)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
+def apply_savgol_filter(source, output_file, window_length=51, polyorder=3, streaming=False, per_channel=False):
+    session = as_session(source)
+    if streaming:
+        stream_savgol_filter(session.filename, output_file, window_length, polyorder, per_channel)
+        return
+    fs, data = session.fs, session.data
     filtered_data = savgol_filter(data, window_length, polyorder)
     filtered_data = np.int16(filtered_data / np.max(np.abs(filtered_data)) * 32767)
     wavfile.write(output_file, fs, filtered_data)
@@ -42,75 +33,54 @@ def butter_lowpass(cutoff, fs, order=5):
     b, a = butter(order, normal_cutoff, btype='low', analog=False)
     return b, a
 
-def apply_lowpass_filter(input_file, output_file, cutoff=1000, order=6):
-    fs, data = wavfile.read(input_file)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
+def apply_lowpass_filter(source, output_file, cutoff=1000, order=6, streaming=False):
+    session = as_session(source)
+    if streaming:
+        stream_lowpass_filter(session.filename, output_file, cutoff, order)
+        return
+    fs, data = session.fs, session.data
     b, a = butter_lowpass(cutoff, fs, order)
     filtered_data = lfilter(b, a, data)
     filtered_data = np.int16(filtered_data / np.max(np.abs(filtered_data)) * 32767)
     wavfile.write(output_file, fs, filtered_data)
 
-def find_high_energy_moments(filename, delta_t=0.1, delta_f=(40, 50)):
-    fs, data = wavfile.read(filename)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
+def find_high_energy_moments(source, delta_t=0.1, delta_f=(40, 50)):
+    session = as_session(source)
     nperseg = 1024
     noverlap = nperseg // 2
-    window = hann(nperseg)
-    f, t, Sxx = spectrogram(data, fs, window=window, nperseg=nperseg, noverlap=noverlap, scaling='density', mode='magnitude')
+    f, t, Sxx = session.spectrogram(nperseg, noverlap, 'hann')
     freq_mask = (f >= delta_f[0]) & (f <= delta_f[1])
     Sxx_filtered = Sxx[freq_mask, :]
     energy = Sxx_filtered.mean(axis=0)
     energy_normalized = (energy - np.min(energy)) / (np.max(energy) - np.min(energy))
     threshold = 0.8
     high_energy_indices = np.where(energy_normalized >= threshold)[0]
-    high_energy_times = []
-    last_time = -np.inf
-    for idx in high_energy_indices:
-        current_time = t[idx]
-        if current_time - last_time >= delta_t:
-            high_energy_times.append(current_time)
-            last_time = current_time
-    return high_energy_times
+    return debounce_times(t[high_energy_indices], delta_t)
 
-def plot_spectrogram_with_moments(filename, output_image, moments):
-    fs, data = wavfile.read(filename)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
+def plot_spectrogram_with_moments(source, output_image, moments):
+    session = as_session(source)
+    fs = session.fs
     nperseg = 1024
     noverlap = nperseg // 2
-    window = hann(nperseg)
-    f, t, Sxx = spectrogram(data, fs, window=window, nperseg=nperseg, noverlap=noverlap, scaling='density', mode='magnitude')
-    Sxx_db = 10 * np.log10(Sxx + 1e-10)
-    plt.figure(figsize=(10, 6))
-    plt.pcolormesh(t, f, Sxx_db, shading='gouraud', cmap='magma')
-    plt.yscale('log')
-    plt.colorbar(label='Уровень (дБ)')
-    plt.ylabel('Частота [Гц]')
-    plt.xlabel('Время [с]')
-    plt.title('Спектрограмма с моментами высокой энергии')
-    plt.ylim([20, fs / 2])
-    for moment in moments:
-        plt.axvline(x=moment, color='cyan', linestyle='--', linewidth=1)
-    plt.savefig(output_image)
-    plt.close()
+    f, t, Sxx = session.spectrogram(nperseg, noverlap, 'hann')
+    render_spectrogram(f, t, Sxx, output_image, fmin=20, fmax=fs / 2, cmap='magma', title='Спектрограмма с моментами высокой энергии', moments=moments)
 
 def main():
-    original = 'noisy_drums.wav'
+    original = AnalysisSession('noisy_drums.wav')
     savgol_file = 'noisy_drums_savgol.wav'
     lowpass_file = 'noisy_drums_lowpass.wav'
     
     plot_spectrogram(original, 'spectrogram_original.png')
     
     apply_savgol_filter(original, savgol_file)
-    plot_spectrogram(savgol_file, 'spectrogram_savgol.png')
+    savgol = AnalysisSession(savgol_file)
+    plot_spectrogram(savgol, 'spectrogram_savgol.png')
     
     apply_lowpass_filter(original, lowpass_file, cutoff=1000, order=6)
     plot_spectrogram(lowpass_file, 'spectrogram_lowpass.png')
     
-    high_energy_moments = find_high_energy_moments(savgol_file, delta_t=0.1, delta_f=(40, 50))
-    plot_spectrogram_with_moments(savgol_file, 'spectrogram_with_moments.png', high_energy_moments)
+    high_energy_moments = find_high_energy_moments(savgol, delta_t=0.1, delta_f=(40, 50))
+    plot_spectrogram_with_moments(savgol, 'spectrogram_with_moments.png', high_energy_moments)
     
     print("Моменты времени с наибольшей энергией в диапазоне 40-50 Гц:")
     for moment in high_energy_moments:
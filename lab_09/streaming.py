@@ -0,0 +1,215 @@
+from functools import lru_cache
+
+import numpy as np
+import soundfile as sf
+from scipy.fft import irfft, next_fast_len, rfft
+from scipy.signal import butter, get_window, savgol_coeffs, sosfilt
+
+BLOCK_SIZE = 1 << 16
+
+
+def butter_lowpass_sos(cutoff, fs, order=5):
+    nyq = 0.5 * fs
+    normal_cutoff = cutoff / nyq
+    return butter(order, normal_cutoff, btype='low', analog=False, output='sos')
+
+
+def read_blocks(input_file, blocksize=BLOCK_SIZE, mono=True):
+    for block in sf.blocks(input_file, blocksize=blocksize, dtype='float64', always_2d=True):
+        yield block.mean(axis=1) if mono else block
+
+
+def sos_filter_blocks(sos, blocks):
+    zi = np.zeros((sos.shape[0], 2))
+    for block in blocks:
+        filtered, zi = sosfilt(sos, block, zi=zi)
+        yield filtered
+
+
+def write_pcm16_blocks(output_file, fs, blocks, gain, channels=1):
+    with sf.SoundFile(output_file, 'w', samplerate=fs, channels=channels, subtype='PCM_16') as out:
+        for block in blocks:
+            out.write(np.int16(np.clip(block * gain, -1, 1) * 32767))
+
+
+def peak_gain(blocks):
+    peak = max((np.max(np.abs(block)) for block in blocks if block.size), default=0.0)
+    return 1 / peak if peak > 0 else 1.0
+
+
+def stream_lowpass_filter(input_file, output_file, cutoff=1000, order=6, gain=None, blocksize=BLOCK_SIZE):
+    fs = sf.info(input_file).samplerate
+    sos = butter_lowpass_sos(cutoff, fs, order)
+
+    def filtered():
+        return sos_filter_blocks(sos, read_blocks(input_file, blocksize))
+
+    # Without a fixed gain the first pass only looks for the output peak.
+    if gain is None:
+        gain = peak_gain(filtered())
+    write_pcm16_blocks(output_file, fs, filtered(), gain)
+
+
+@lru_cache(maxsize=16)
+def savgol_design(window_length, polyorder):
+    if window_length % 2 == 0:
+        raise ValueError('window_length must be odd for the streaming filter.')
+    if polyorder >= window_length:
+        raise ValueError('polyorder must be less than window_length.')
+
+    coeffs = savgol_coeffs(window_length, polyorder)
+
+    # mode='interp' replaces the outer half windows with the value of the
+    # polynomial fitted to the first/last window; both are linear maps.
+    half = window_length // 2
+    positions = np.arange(window_length)
+    fit = np.linalg.pinv(np.vander(positions, polyorder + 1))
+    left = np.vander(positions[:half], polyorder + 1) @ fit
+    right = np.vander(positions[window_length - half:], polyorder + 1) @ fit
+
+    for array in (coeffs, left, right):
+        array.setflags(write=False)
+    return coeffs, left, right
+
+
+@lru_cache(maxsize=16)
+def _kernel_spectrum(window_length, polyorder, nfft):
+    spectrum = rfft(savgol_design(window_length, polyorder)[0], nfft)
+    spectrum.setflags(write=False)
+    return spectrum
+
+
+def _valid_convolution(buf, window_length, polyorder):
+    # Overlap-save: with nfft >= len(buf) the circular wrap-around only
+    # touches the first window_length - 1 outputs, which are dropped.
+    nfft = next_fast_len(len(buf), real=True)
+    spectrum = _kernel_spectrum(window_length, polyorder, nfft)
+    if buf.ndim > 1:
+        spectrum = spectrum[:, None]
+    return irfft(rfft(buf, nfft, axis=0) * spectrum, nfft, axis=0)[window_length - 1:len(buf)]
+
+
+def savgol_filter_blocks(blocks, window_length=51, polyorder=3):
+    _, left, right = savgol_design(window_length, polyorder)
+
+    pending = None
+    last_window = None
+    for block in blocks:
+        buf = block if pending is None else np.concatenate((pending, block))
+        if len(buf) < window_length:
+            pending = buf
+            continue
+
+        if last_window is None:
+            yield left @ buf[:window_length]
+        yield _valid_convolution(buf, window_length, polyorder)
+
+        pending = buf[len(buf) - window_length + 1:]
+        last_window = buf[len(buf) - window_length:]
+
+    if last_window is None:
+        raise ValueError('window_length must be less than or equal to the size of the signal.')
+    yield right @ last_window
+
+
+def stream_savgol_filter(input_file, output_file, window_length=51, polyorder=3, per_channel=False, gain=None, blocksize=BLOCK_SIZE):
+    info = sf.info(input_file)
+    channels = info.channels if per_channel else 1
+
+    def filtered():
+        blocks = read_blocks(input_file, blocksize, mono=not per_channel)
+        return savgol_filter_blocks(blocks, window_length, polyorder)
+
+    if gain is None:
+        gain = peak_gain(filtered())
+    write_pcm16_blocks(output_file, info.samplerate, filtered(), gain, channels)
+
+
+def debounce_times(times, delta_t, last_time=-np.inf):
+    # Greedy debounce that jumps between accepted events with searchsorted
+    # instead of visiting every candidate; the checks mirror the loop form
+    # current_time - last_time >= delta_t exactly.
+    times = np.asarray(times)
+    accepted = []
+    start = 0
+    while start < len(times):
+        idx = start + np.searchsorted(times[start:], last_time + delta_t)
+        while idx > start and times[idx - 1] - last_time >= delta_t:
+            idx -= 1
+        while idx < len(times) and times[idx] - last_time < delta_t:
+            idx += 1
+        if idx == len(times):
+            break
+        last_time = times[idx]
+        accepted.append(last_time)
+        start = idx + 1
+    return accepted
+
+
+class EnergyDetector:
+    def __init__(self, fs, delta_t=0.1, delta_f=(40, 50), threshold=0.8, nperseg=1024, noverlap=None, norm_frames=None):
+        self.fs = fs
+        self.delta_t = delta_t
+        self.threshold = threshold
+        self.nperseg = nperseg
+        self.hop = nperseg - (nperseg // 2 if noverlap is None else noverlap)
+        self.norm_frames = norm_frames
+
+        # Same scaling as spectrogram(scaling='density', mode='magnitude').
+        window = get_window('hann', nperseg, fftbins=False)
+        self.window = window * np.sqrt(1.0 / (fs * np.sum(window**2)))
+        freqs = np.fft.rfftfreq(nperseg, 1 / fs)
+        self.band = (freqs >= delta_f[0]) & (freqs <= delta_f[1])
+
+        self.buffer = np.zeros(0)
+        self.frame_index = 0
+        self.history = np.zeros(0)
+        self.low, self.high = np.inf, -np.inf
+        self.last_time = -np.inf
+
+    @property
+    def latency(self):
+        return self.nperseg / self.fs
+
+    def _band_energy(self, frames):
+        frames = frames - frames.mean(axis=1, keepdims=True)
+        spectrum = np.abs(np.fft.rfft(frames * self.window, axis=1))
+        return spectrum[:, self.band].mean(axis=1)
+
+    def _normalize(self, energy):
+        if self.norm_frames is None:
+            low = np.minimum.accumulate(np.concatenate(([self.low], energy)))[1:]
+            high = np.maximum.accumulate(np.concatenate(([self.high], energy)))[1:]
+            self.low, self.high = low[-1], high[-1]
+        else:
+            values = np.concatenate((self.history, energy))
+            padded = np.concatenate((np.full(self.norm_frames - 1 - len(self.history), np.nan), values))
+            windows = np.lib.stride_tricks.sliding_window_view(padded, self.norm_frames)[-len(energy):]
+            low, high = np.nanmin(windows, axis=1), np.nanmax(windows, axis=1)
+            self.history = values[-(self.norm_frames - 1):] if self.norm_frames > 1 else values[:0]
+
+        spread = high - low
+        return np.divide(energy - low, spread, out=np.zeros_like(energy), where=spread > 0)
+
+    def process(self, chunk):
+        self.buffer = np.concatenate((self.buffer, np.asarray(chunk, dtype=np.float64)))
+        if len(self.buffer) < self.nperseg:
+            return []
+
+        frames = np.lib.stride_tricks.sliding_window_view(self.buffer, self.nperseg)[::self.hop]
+        energy = self._band_energy(frames)
+        times = (self.nperseg / 2 + (self.frame_index + np.arange(len(frames))) * self.hop) / self.fs
+        self.frame_index += len(frames)
+        self.buffer = self.buffer[len(frames) * self.hop:]
+
+        candidates = times[self._normalize(energy) >= self.threshold]
+        events = debounce_times(candidates, self.delta_t, self.last_time)
+        if events:
+            self.last_time = events[-1]
+        return events
+
+
+def detect_energy_events(input_file, blocksize=4096, **detector_kwargs):
+    detector = EnergyDetector(sf.info(input_file).samplerate, **detector_kwargs)
+    for block in read_blocks(input_file, blocksize):
+        yield from detector.process(block)
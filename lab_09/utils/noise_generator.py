@@ -1,8 +1,18 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
+
 import numpy as np
 import soundfile as sf
 from scipy.signal import lfilter
 import matplotlib.pyplot as plt
 
+PINK_B = [0.049922035, -0.095993537, 0.050612699, -0.004408786]
+PINK_A = [1.0, -2.494956002, 2.017265875, -0.522189400]
+BLOCK_SIZE = 1 << 16
+
 
 def generate_white_noise(length):
     return np.random.normal(0, 1, length)
@@ -13,10 +23,8 @@ def generate_uniform_noise(length):
 
 
 def generate_pink_noise(length):
-    b = [0.049922035, -0.095993537, 0.050612699, -0.004408786]
-    a = [1.0, -2.494956002, 2.017265875, -0.522189400]
     white = np.random.normal(0, 1, length)
-    pink = lfilter(b, a, white)
+    pink = lfilter(PINK_B, PINK_A, white)
     return pink
 
 
@@ -26,12 +34,32 @@ def generate_brown_noise(length):
     return brown
 
 
+def plot_signals_comparison(y, y_noisy, sr, snr_db, output_image):
+    plt.figure(figsize=(14, 6))
+    plt.subplot(2, 1, 1)
+    time = np.linspace(0, len(y) / sr, num=len(y))
+    plt.plot(time, y, color="blue")
+    plt.title("Исходный сигнал")
+    plt.xlabel("Время (с)")
+    plt.ylabel("Амплитуда")
+    plt.subplot(2, 1, 2)
+    time_noisy = np.linspace(0, len(y_noisy) / sr, num=len(y_noisy))
+    plt.plot(time_noisy, y_noisy, color="red")
+    plt.title(f"Зашумленный сигнал (SNR = {snr_db} дБ)")
+    plt.xlabel("Время (с)")
+    plt.ylabel("Амплитуда")
+    plt.tight_layout()
+    plt.savefig(output_image)
+    plt.close()
+
+
 def add_random_noise_to_wav(
     input_file,
     output_file,
     snr_db=20,
     noise_types=None,
     combine_ratio=0.5,
+    plot_path="./utils/signals_comparison_random_noise.png",
 ):
     if noise_types is None:
         noise_types = ["white", "pink", "brown"]
@@ -64,21 +92,142 @@ def add_random_noise_to_wav(
     if max_val > 0:
         y_noisy = y_noisy / max_val * 0.99
     sf.write(output_file, y_noisy, sr)
-    plt.figure(figsize=(14, 6))
-    plt.subplot(2, 1, 1)
-    time = np.linspace(0, len(y) / sr, num=len(y))
-    plt.plot(time, y, color="blue")
-    plt.title("Исходный сигнал")
-    plt.xlabel("Время (с)")
-    plt.ylabel("Амплитуда")
-    plt.subplot(2, 1, 2)
-    time_noisy = np.linspace(0, len(y_noisy) / sr, num=len(y_noisy))
-    plt.plot(time_noisy, y_noisy, color="red")
-    plt.title(f"Зашумленный сигнал (SNR = {snr_db} дБ)")
-    plt.xlabel("Время (с)")
-    plt.ylabel("Амплитуда")
-    plt.tight_layout()
-    plt.savefig("./utils/signals_comparison_random_noise.png")
+    if plot_path is not None:
+        plot_signals_comparison(y, y_noisy, sr, snr_db, plot_path)
+
+
+@dataclass
+class NoiseVariant:
+    output_file: str
+    seed: int
+    snr_db: float = 20
+    plot_path: Optional[str] = None
+
+
+def generate_noise_blocks(seed, noise_types, length, blocksize=BLOCK_SIZE):
+    # Each noise type draws from its own stream, so the blocks are the same
+    # for any block size and can be regenerated from the seed.
+    generators = [
+        np.random.default_rng(child)
+        for child in np.random.SeedSequence(seed).spawn(len(noise_types))
+    ]
+    pink_state = np.zeros(len(PINK_A) - 1)
+    brown_offset = 0.0
+
+    for start in range(0, length, blocksize):
+        size = min(blocksize, length - start)
+        block = np.empty((size, len(noise_types)))
+        for idx, (noise_type, rng) in enumerate(zip(noise_types, generators)):
+            if noise_type == "white":
+                block[:, idx] = rng.normal(0, 1, size)
+            elif noise_type == "uniform":
+                block[:, idx] = rng.uniform(-1, 1, size)
+            elif noise_type == "pink":
+                block[:, idx], pink_state = lfilter(
+                    PINK_B, PINK_A, rng.normal(0, 1, size), zi=pink_state
+                )
+            elif noise_type == "brown":
+                brown = np.cumsum(rng.normal(0, 1, size))
+                brown += brown_offset
+                brown_offset = brown[-1]
+                block[:, idx] = brown
+            else:
+                raise ValueError(f"Unsupported noise type: {noise_type}")
+        yield start, block
+
+
+def noise_mix_weights(seed, noise_types, length, combine_ratio, blocksize):
+    # Brown noise is scaled by its global peak and the SNR needs the power of
+    # the mix, so one pass collects the peak and the Gram matrix of the raw
+    # components; the mix power then follows without storing any noise.
+    gram = np.zeros((len(noise_types), len(noise_types)))
+    brown_peak = 0.0
+    for _, block in generate_noise_blocks(seed, noise_types, length, blocksize):
+        gram += block.T @ block
+        if "brown" in noise_types:
+            brown = block[:, noise_types.index("brown")]
+            brown_peak = max(brown_peak, np.max(np.abs(brown)))
+
+    weights = np.full(len(noise_types), combine_ratio / len(noise_types))
+    if brown_peak > 0:
+        weights[noise_types.index("brown")] /= brown_peak
+    noise_power = weights @ gram @ weights / length
+    return weights, noise_power
+
+
+_CLEAN_SIGNAL = None
+
+
+def _init_worker(y, sr):
+    global _CLEAN_SIGNAL
+    _CLEAN_SIGNAL = (y, sr)
+
+
+def render_noise_variant(
+    variant, noise_types, combine_ratio=0.5, blocksize=BLOCK_SIZE, clean=None
+):
+    y, sr = clean if clean is not None else _CLEAN_SIGNAL
+    length = len(y)
+    weights, noise_power = noise_mix_weights(
+        variant.seed, noise_types, length, combine_ratio, blocksize
+    )
+
+    signal_power = np.mean(np.square(y, dtype=np.float64))
+    desired_noise_power = signal_power / 10 ** (variant.snr_db / 10)
+    weights = weights * np.sqrt(desired_noise_power / noise_power)
+
+    def noisy_blocks():
+        for start, block in generate_noise_blocks(
+            variant.seed, noise_types, length, blocksize
+        ):
+            yield y[start : start + len(block)] + block @ weights
+
+    max_val = max(np.max(np.abs(block)) for block in noisy_blocks())
+    gain = 0.99 / max_val if max_val > 0 else 1.0
+
+    with sf.SoundFile(variant.output_file, "w", samplerate=sr, channels=1) as out:
+        for block in noisy_blocks():
+            out.write(block * gain)
+
+    if variant.plot_path is not None:
+        y_noisy = np.concatenate(list(noisy_blocks())) * gain
+        plot_signals_comparison(y, y_noisy, sr, variant.snr_db, variant.plot_path)
+
+    return variant.output_file
+
+
+def augment_wav(
+    input_file,
+    variants,
+    noise_types=None,
+    combine_ratio=0.5,
+    blocksize=BLOCK_SIZE,
+    workers=None,
+):
+    if noise_types is None:
+        noise_types = ["white", "pink", "brown"]
+    y, sr = sf.read(input_file, dtype="float32")
+    if y.ndim > 1:
+        y = np.mean(y, axis=1, dtype=np.float32)
+
+    if workers == 1:
+        return [
+            render_noise_variant(variant, noise_types, combine_ratio, blocksize, (y, sr))
+            for variant in variants
+        ]
+
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(variants) // (4 * workers))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(y, sr)
+    ) as executor:
+        render = partial(
+            render_noise_variant,
+            noise_types=noise_types,
+            combine_ratio=combine_ratio,
+            blocksize=blocksize,
+        )
+        return list(executor.map(render, variants, chunksize=chunksize))
 
 
 def main():
@@ -0,0 +1,221 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+from media_core.session import AnalysisSession
+
+from main import (
+    find_formants,
+    find_fundamental_tone,
+    find_high_energy_moments,
+    find_min_max_frequency,
+)
+
+STAGES = ("load", "stft", "min_max", "fundamental", "formants", "moments")
+# find_min_max_frequency and find_high_energy_moments share this spectrogram.
+SHARED_NPERSEG = 1024
+AUDIO_EXTENSIONS = (".wav",)
+
+
+def result_columns(num_formants=3):
+    formants = [f"formant_{idx}" for idx in range(1, num_formants + 1)]
+    timings = [f"time_{stage}" for stage in STAGES]
+    return [
+        "path",
+        "min_freq",
+        "max_freq",
+        "fundamental",
+        *formants,
+        "moments_count",
+        "moments",
+        *timings,
+        "time_total",
+        "error",
+    ]
+
+
+def collect_files(source):
+    if os.path.isdir(source):
+        files = []
+        for root, _, filenames in os.walk(source):
+            for filename in filenames:
+                if filename.lower().endswith(AUDIO_EXTENSIONS):
+                    files.append(os.path.abspath(os.path.join(root, filename)))
+        return sorted(files)
+
+    # A manifest lists one file per line, relative to the manifest itself;
+    # paths are absolute either way so resume matches them across runs.
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as manifest:
+        lines = [line.strip() for line in manifest]
+    return [
+        os.path.join(base_dir, line)
+        for line in lines
+        if line and not line.startswith("#")
+    ]
+
+
+def analyze_file(
+    filename, num_formants=3, delta_t=0.1, energy_threshold=0.8, engine="peaks"
+):
+    row = dict.fromkeys(result_columns(num_formants), "")
+    row["path"] = filename
+    timings = dict.fromkeys(STAGES, 0.0)
+    started = time.perf_counter()
+
+    def timed(stage, func, *args, **kwargs):
+        stage_start = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings[stage] = time.perf_counter() - stage_start
+        return result
+
+    try:
+        session = AnalysisSession(filename)
+        timed("load", lambda: session.data)
+        # Computed up front, so its cost is not charged to whichever stage
+        # happens to ask for it first.
+        timed("stft", session.spectrogram, SHARED_NPERSEG, SHARED_NPERSEG // 2)
+        min_freq, max_freq = timed("min_max", find_min_max_frequency, session)
+        fundamental = timed("fundamental", find_fundamental_tone, session)
+        formants = timed(
+            "formants", find_formants, session, num_formants, engine=engine
+        )
+        moments = timed(
+            "moments",
+            find_high_energy_moments,
+            session,
+            delta_t=delta_t,
+            energy_threshold=energy_threshold,
+        )
+
+        row["min_freq"], row["max_freq"] = float(min_freq), float(max_freq)
+        if not np.isnan(fundamental):
+            row["fundamental"] = float(fundamental)
+        for idx, value in enumerate(formants, 1):
+            row[f"formant_{idx}"] = float(value)
+        row["moments_count"] = len(moments)
+        row["moments"] = " ".join(f"{moment:.3f}" for moment in moments)
+    except Exception as error:
+        row["error"] = f"{type(error).__name__}: {error}"
+
+    for stage, seconds in timings.items():
+        row[f"time_{stage}"] = round(seconds, 6)
+    row["time_total"] = round(time.perf_counter() - started, 6)
+    return row
+
+
+def latest_rows(output_csv):
+    # Retried files are appended again, so the last row per path wins.
+    rows = {}
+    with open(output_csv, newline="", encoding="utf-8") as file:
+        reader = csv.DictReader(file, delimiter=";")
+        for row in reader:
+            rows.pop(row["path"], None)
+            rows[row["path"]] = row
+    return reader.fieldnames, list(rows.values())
+
+
+def finished_files(output_csv):
+    if not os.path.isfile(output_csv):
+        return set()
+    _, rows = latest_rows(output_csv)
+    return {row["path"] for row in rows if not row["error"]}
+
+
+def upgrade_csv(output_csv, columns):
+    # Appending under a different header would shift every new row, so an
+    # older layout is rewritten first; losing columns needs a fresh file.
+    fieldnames, rows = latest_rows(output_csv)
+    if fieldnames == columns:
+        return
+    dropped = [name for name in fieldnames or [] if name not in columns]
+    if dropped:
+        raise ValueError(
+            f"{output_csv} has columns this run does not write: {dropped}; "
+            "use another output file or resume=False"
+        )
+
+    with open(output_csv, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=columns, delimiter=";")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run_batch(
+    source,
+    output_csv,
+    workers=None,
+    chunksize=None,
+    resume=True,
+    num_formants=3,
+    **options,
+):
+    all_files = collect_files(source)
+    done = finished_files(output_csv) if resume else set()
+    files = [filename for filename in all_files if filename not in done]
+
+    columns = result_columns(num_formants)
+    analyze = partial(analyze_file, num_formants=num_formants, **options)
+    append = resume and os.path.isfile(output_csv)
+    if append:
+        upgrade_csv(output_csv, columns)
+    mode = "a" if append else "w"
+
+    with open(output_csv, mode, newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=columns, delimiter=";")
+        if not append:
+            writer.writeheader()
+
+        # Rows are flushed as soon as they arrive, so an interrupted run
+        # resumes after the last file that made it to disk.
+        if workers == 1:
+            for row in map(analyze, files):
+                writer.writerow(row)
+                file.flush()
+        else:
+            workers = workers or os.cpu_count()
+            chunksize = chunksize or max(1, min(64, len(files) // (4 * workers)))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for row in executor.map(analyze, files, chunksize=chunksize):
+                    writer.writerow(row)
+                    file.flush()
+
+    return len(all_files) - len(files), len(files)
+
+
+def export_npz(output_csv, output_npz):
+    fieldnames, rows = latest_rows(output_csv)
+    columns = {name: [] for name in fieldnames}
+    for row in rows:
+        for name, value in row.items():
+            columns[name].append(value)
+
+    arrays = {}
+    for name, values in columns.items():
+        if name in ("path", "moments", "error"):
+            arrays[name] = np.array(values, dtype=str)
+        else:
+            arrays[name] = np.array(
+                [float(value) if value else np.nan for value in values]
+            )
+    np.savez_compressed(output_npz, **arrays)
+
+
+def main():
+    source = input("Введите путь к папке с записями или к файлу-манифесту: ")
+    output_csv = input("Введите путь к CSV-файлу с результатами: ")
+
+    skipped, processed = run_batch(source, output_csv)
+    print(f"Пропущено уже обработанных файлов: {skipped}")
+    print(f"Обработано файлов: {processed}")
+
+    output_npz = os.path.splitext(output_csv)[0] + ".npz"
+    export_npz(output_csv, output_npz)
+    print(f"Результаты сохранены в {output_csv} и {output_npz}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import numpy as np
+from scipy.signal import find_peaks
+
+BATCH_FRAMES = 4096
+
+
+def _frame_peaks(spectrum, height, distance, num_formants):
+    peaks, properties = find_peaks(spectrum, height=height, distance=distance)
+    if len(peaks) < num_formants:
+        return None
+    order = np.argsort(properties["peak_heights"])[::-1][:num_formants]
+    return peaks[order]
+
+
+def _batch_peaks(band, rel_height, distance, num_formants):
+    frames, bins = band.shape
+    heights = band.max(axis=1, keepdims=True) * rel_height
+
+    # Strict local maxima above the relative height; the band edges never
+    # qualify, as in find_peaks on the masked slice.
+    inner = band[:, 1:-1]
+    is_peak = (inner > band[:, :-2]) & (inner > band[:, 2:]) & (inner >= heights)
+    candidates = np.full(band.shape, -np.inf, dtype=band.dtype)
+    np.copyto(candidates[:, 1:-1], inner, where=is_peak)
+
+    # find_peaks keeps peaks in order of height and drops everything closer
+    # than `distance` to a kept one, so the N highest kept peaks are the
+    # first N picks of the same greedy pass.
+    rows = np.arange(frames)
+    columns = np.arange(bins, dtype=np.int32)
+    picks = np.empty((frames, num_formants), dtype=np.intp)
+    found = np.ones(frames, dtype=bool)
+    for idx in range(num_formants):
+        best = np.argmax(candidates, axis=1)
+        found &= candidates[rows, best] > -np.inf
+        picks[:, idx] = best
+        near = best[:, None].astype(np.int32)
+        suppressed = (columns > near - distance) & (columns < near + distance)
+        np.copyto(candidates, -np.inf, where=suppressed)
+
+    # find_peaks places the peak of a flat top in its middle; such frames
+    # are rare and go through it directly.
+    flat = (band[:, 1:] == band[:, :-1]) & (band[:, 1:] >= heights)
+    plateau = np.any(flat, axis=1)
+    for frame in np.flatnonzero(plateau):
+        frame_picks = _frame_peaks(
+            band[frame], heights[frame, 0], distance, num_formants
+        )
+        found[frame] = frame_picks is not None
+        if frame_picks is not None:
+            picks[frame] = frame_picks
+
+    return picks, found
+
+
+def formant_peaks(
+    f,
+    Sxx,
+    num_formants=3,
+    fmin=300,
+    fmax=5000,
+    rel_height=0.3,
+    distance=40,
+    batch_frames=BATCH_FRAMES,
+):
+    band_mask = (f > fmin) & (f < fmax)
+    band_freqs = f[band_mask]
+    band_bins = np.flatnonzero(band_mask)
+
+    formants = np.full((Sxx.shape[1], num_formants), np.nan)
+    if len(band_bins) < 3:
+        return formants
+
+    for start in range(0, Sxx.shape[1], batch_frames):
+        stop = min(start + batch_frames, Sxx.shape[1])
+        # One transposed copy per batch keeps every frame's bins contiguous.
+        band = Sxx[band_bins[0] : band_bins[-1] + 1, start:stop]
+        band = np.ascontiguousarray(band.T)
+        picks, found = _batch_peaks(band, rel_height, distance, num_formants)
+        formants[start:stop][found] = np.sort(band_freqs[picks[found]], axis=1)
+
+    return formants
@@ -0,0 +1,202 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque
+
+import numpy as np
+from media_core.audio import read_wav
+from scipy.signal import get_window
+
+from formants import formant_peaks
+from pitch import (
+    FMAX,
+    FMIN,
+    THRESHOLD,
+    cumulative_mean_normalized,
+    difference_function,
+    pick_period,
+)
+
+CHUNK_SIZE = 1024
+LATENCY_HISTORY = 1000
+
+
+class RingBuffer:
+    def __init__(self, capacity):
+        # Every sample is stored twice, capacity apart, so the latest
+        # `length` samples are always one contiguous slice.
+        self.capacity = capacity
+        self.data = np.zeros(2 * capacity, dtype=np.float64)
+        self.total = 0
+
+    def extend(self, samples):
+        # Samples older than the capacity are dropped but still counted, so
+        # positions and timestamps stay aligned with the stream.
+        skipped = max(0, len(samples) - self.capacity)
+        self.total += skipped
+        samples = samples[skipped:]
+        start = self.total % self.capacity
+        first = min(len(samples), self.capacity - start)
+        for offset in (0, self.capacity):
+            self.data[offset + start : offset + start + first] = samples[:first]
+            self.data[offset : offset + len(samples) - first] = samples[first:]
+        self.total += len(samples)
+
+    def latest(self, length):
+        end = self.total % self.capacity + self.capacity
+        return self.data[end - length : end]
+
+
+@dataclass
+class HopResult:
+    time: float
+    f0: float
+    confidence: float
+    formants: np.ndarray
+    energy: float
+    event: bool
+
+
+@dataclass
+class ChunkLatency:
+    samples: int
+    hops: int
+    seconds: float
+
+
+@dataclass
+class LiveAnalyzer:
+    fs: int
+    nperseg: int = 2048
+    hop: int = 512
+    num_formants: int = 3
+    fmin: float = FMIN
+    fmax: float = FMAX
+    delta_t: float = 0.1
+    energy_threshold: float = 0.8
+    latencies: Deque[ChunkLatency] = field(
+        default_factory=lambda: deque(maxlen=LATENCY_HISTORY)
+    )
+
+    def __post_init__(self):
+        self.max_lag = int(np.ceil(self.fs / self.fmin))
+        self.min_lag = max(2, int(self.fs // self.fmax))
+        self.pitch_length = 2 * self.max_lag
+        self.buffer = RingBuffer(max(self.nperseg, self.pitch_length))
+
+        # Same scaling as spectrogram(scaling='density', mode='magnitude').
+        window = get_window("hann", self.nperseg, fftbins=False)
+        self.window = window * np.sqrt(1.0 / (self.fs * np.sum(window**2)))
+        self.freqs = np.fft.rfftfreq(self.nperseg, 1 / self.fs)
+
+        self.until_hop = self.nperseg
+        self.low, self.high = np.inf, -np.inf
+        self.last_event = -np.inf
+
+    @property
+    def chunk_realtime_factor(self):
+        if not self.latencies:
+            return 0.0
+        seconds = sum(latency.seconds for latency in self.latencies)
+        samples = sum(latency.samples for latency in self.latencies)
+        return seconds * self.fs / samples if samples else 0.0
+
+    def _pitch(self):
+        if self.buffer.total < self.pitch_length:
+            return np.nan, 0.0
+        frame = self.buffer.latest(self.pitch_length)[None, :]
+        frame = frame - frame.mean()
+        diff = difference_function(frame, self.max_lag, self.max_lag)
+        normalized = cumulative_mean_normalized(diff)
+        period, aperiodicity = pick_period(diff, normalized, self.min_lag, THRESHOLD)
+        confidence = float(np.clip(1 - aperiodicity[0], 0, 1))
+        if aperiodicity[0] >= THRESHOLD:
+            return np.nan, confidence
+        return self.fs / period[0], confidence
+
+    def _analyze_hop(self):
+        frame = self.buffer.latest(self.nperseg)
+        magnitude = np.abs(np.fft.rfft((frame - frame.mean()) * self.window))
+
+        formants = formant_peaks(
+            self.freqs, magnitude[:, None], self.num_formants, fmin=300, fmax=5000
+        )[0]
+        f0, confidence = self._pitch()
+
+        # Energy is normalized by the running range, as the offline version
+        # does with the range of the whole recording.
+        energy = float(np.mean(magnitude))
+        self.low, self.high = min(self.low, energy), max(self.high, energy)
+        spread = self.high - self.low
+        normalized = (energy - self.low) / spread if spread > 0 else 0.0
+
+        hop_time = (self.buffer.total - self.nperseg / 2) / self.fs
+        event = (
+            normalized >= self.energy_threshold
+            and hop_time - self.last_event >= self.delta_t
+        )
+        if event:
+            self.last_event = hop_time
+
+        return HopResult(hop_time, f0, confidence, formants, energy, event)
+
+    def process(self, chunk):
+        started = time.perf_counter()
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim > 1:
+            chunk = chunk.mean(axis=1)
+
+        # The chunk is fed up to each hop boundary so every hop sees exactly
+        # the samples it would see in the offline STFT.
+        results = []
+        position = 0
+        while position < len(chunk):
+            step = min(self.until_hop, len(chunk) - position)
+            self.buffer.extend(chunk[position : position + step])
+            position += step
+            self.until_hop -= step
+            if self.until_hop == 0:
+                results.append(self._analyze_hop())
+                self.until_hop = self.hop
+
+        elapsed = time.perf_counter() - started
+        self.latencies.append(ChunkLatency(len(chunk), len(results), elapsed))
+        return results
+
+
+def simulate_stream(filename, chunk_size=CHUNK_SIZE, realtime=False):
+    # Samples keep the units load_mono gives, so hops line up with the
+    # offline analyses of the same file.
+    fs, data = read_wav(filename)
+
+    def chunks():
+        started = time.perf_counter()
+        for start in range(0, len(data), chunk_size):
+            if realtime:
+                delay = start / fs - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield np.asarray(data[start : start + chunk_size], dtype=np.float64)
+
+    return fs, chunks()
+
+
+def main():
+    fs, chunks = simulate_stream("barking.wav")
+    analyzer = LiveAnalyzer(fs)
+
+    for chunk in chunks:
+        for result in analyzer.process(chunk):
+            if result.event:
+                print(f"Момент высокой энергии: {result.time:.2f} с")
+
+    latencies = np.array([latency.seconds for latency in analyzer.latencies])
+    chunk_ms = CHUNK_SIZE / fs * 1000
+    print(f"Длительность блока: {chunk_ms:.2f} мс")
+    print(f"Средняя задержка обработки: {latencies.mean() * 1000:.2f} мс")
+    print(f"Максимальная задержка обработки: {latencies.max() * 1000:.2f} мс")
+    print(f"Доля реального времени: {analyzer.chunk_realtime_factor:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from math import gcd
+
+import numpy as np
+from scipy.fft import irfft, next_fast_len, rfft
+from scipy.signal import get_window, resample_poly
+
+MAX_FORMANT = 5500
+BATCH_FRAMES = 2048
+
+
+def frame_signal(data, frame_length, hop):
+    if len(data) < frame_length:
+        return np.empty((0, frame_length), dtype=data.dtype)
+    return np.lib.stride_tricks.sliding_window_view(data, frame_length)[::hop]
+
+
+def autocorrelation(frames, max_lag):
+    # Zero padding to at least 2N - 1 keeps the circular correlation linear.
+    nfft = next_fast_len(2 * frames.shape[1] - 1, real=True)
+    spectrum = rfft(frames, nfft, axis=1)
+    power = spectrum.real**2 + spectrum.imag**2
+    return irfft(power, nfft, axis=1)[:, : max_lag + 1]
+
+
+def levinson_durbin(r, order):
+    frames = r.shape[0]
+    a = np.zeros((frames, order + 1))
+    a[:, 0] = 1
+    error = r[:, 0].copy()
+    valid = error > 0
+
+    for i in range(1, order + 1):
+        acc = r[:, i] + np.einsum("fj,fj->f", a[:, 1:i], r[:, i - 1 : 0 : -1])
+        k = np.divide(-acc, error, out=np.zeros(frames), where=valid)
+        a[:, 1:i] += k[:, None] * a[:, i - 1 : 0 : -1]
+        a[:, i] = k
+        error *= 1 - k**2
+        valid &= error > 0
+
+    return a, error, valid
+
+
+def polynomial_roots(a):
+    # Roots of z^p + a1 z^(p-1) + ... + ap are the eigenvalues of its
+    # companion matrix; eigvals handles the whole stack at once.
+    frames, order = a.shape[0], a.shape[1] - 1
+    companion = np.zeros((frames, order, order))
+    companion[:, 0] = -a[:, 1:]
+    companion[:, np.arange(1, order), np.arange(order - 1)] = 1
+    return np.linalg.eigvals(companion)
+
+
+def roots_to_formants(roots, fs, num_formants, fmin, fmax, max_bandwidth):
+    freqs = np.angle(roots) * fs / (2 * np.pi)
+    bandwidths = -np.log(np.abs(roots)) * fs / np.pi
+
+    keep = (roots.imag > 0) & (freqs > fmin) & (freqs < fmax)
+    keep &= bandwidths < max_bandwidth
+    freqs = np.sort(np.where(keep, freqs, np.inf), axis=1)[:, :num_formants]
+    freqs[np.isinf(freqs)] = np.nan
+    if freqs.shape[1] < num_formants:
+        missing = num_formants - freqs.shape[1]
+        freqs = np.pad(freqs, ((0, 0), (0, missing)), constant_values=np.nan)
+    return freqs
+
+
+def lpc_formants(
+    data,
+    fs,
+    num_formants=3,
+    order=None,
+    fmin=90,
+    fmax=5000,
+    max_formant=MAX_FORMANT,
+    max_bandwidth=400,
+    frame_ms=25,
+    hop_ms=10,
+    batch_frames=BATCH_FRAMES,
+):
+    # Formants only need the band up to max_formant, which keeps the LPC
+    # order small (one pole per kHz of sampling rate plus two for the
+    # glottal slope).
+    target_fs = 2 * max_formant
+    factor = gcd(int(fs), target_fs)
+    signal = resample_poly(data, target_fs // factor, int(fs) // factor)
+    if order is None:
+        order = 2 + target_fs // 1000
+
+    alpha = np.exp(-2 * np.pi * 50 / target_fs)
+    signal[1:] -= alpha * signal[:-1]
+
+    frame_length = int(round(frame_ms * target_fs / 1000))
+    hop = int(round(hop_ms * target_fs / 1000))
+    window = get_window("hamming", frame_length)
+    frames = frame_signal(signal, frame_length, hop)
+
+    times = (np.arange(len(frames)) * hop + frame_length / 2) / target_fs
+    tracks = np.full((len(frames), num_formants), np.nan)
+    for start in range(0, len(frames), batch_frames):
+        batch = frames[start : start + batch_frames] * window
+        r = autocorrelation(batch, order)
+        a, _, valid = levinson_durbin(r, order)
+        if not valid.any():
+            continue
+        roots = polynomial_roots(a[valid])
+        tracks[start : start + len(batch)][valid] = roots_to_formants(
+            roots, target_fs, num_formants, fmin, fmax, max_bandwidth
+        )
+
+    return times, tracks
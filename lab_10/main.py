@@ -1,61 +1,33 @@
 import os
 
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.io import wavfile
-from scipy.signal import find_peaks, spectrogram
-from scipy.signal.windows import hann
+from media_core.session import AnalysisSession, as_session
+from media_core.spectrogram import render_spectrogram
 
+from formants import formant_peaks
+from lpc import lpc_formants
+from pitch import pitch_summary, yin_track
 
-def plot_spectrogram(filename, output_image):
-    fs, data = wavfile.read(filename)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
+
+def plot_spectrogram(source, output_image):
+    session = as_session(source)
+    fs = session.fs
 
     nperseg = 1024
     noverlap = nperseg // 2
-    window = hann(nperseg)
-
-    f, t, Sxx = spectrogram(
-        data,
-        fs,
-        window=window,
-        nperseg=nperseg,
-        noverlap=noverlap,
-        scaling="density",
-        mode="magnitude",
-    )
 
-    Sxx_db = 10 * np.log10(Sxx + 1e-10)
+    f, t, Sxx = session.spectrogram(nperseg, noverlap, "hann")
 
-    plt.figure(figsize=(10, 6))
-    plt.pcolormesh(t, f, Sxx_db, shading="gouraud", cmap="magma")
-    plt.yscale("log")
-    plt.colorbar(label="Уровень (дБ)")
-    plt.ylabel("Частота [Гц]")
-    plt.xlabel("Время [с]")
-    plt.title("Спектрограмма")
-    plt.ylim([20, fs / 2])
-    plt.savefig(output_image)
-    plt.close()
+    render_spectrogram(
+        f, t, Sxx, output_image, fmin=20, fmax=fs / 2, title="Спектрограмма"
+    )
 
 
-def find_min_max_frequency(filename):
-    fs, data = wavfile.read(filename)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
+def find_min_max_frequency(source):
+    session = as_session(source)
     nperseg = 1024
     noverlap = nperseg // 2
-    window = hann(nperseg)
-    f, t, Sxx = spectrogram(
-        data,
-        fs,
-        window=window,
-        nperseg=nperseg,
-        noverlap=noverlap,
-        scaling="density",
-        mode="magnitude",
-    )
+    f, t, Sxx = session.spectrogram(nperseg, noverlap, "hann")
     power = np.mean(Sxx, axis=1)
     nonzero_indices = np.where(power > 0)[0]
     if len(nonzero_indices) == 0:
@@ -67,110 +39,56 @@ def find_min_max_frequency(filename):
     return min_freq, max_freq
 
 
-def find_fundamental_tone(filename):
-    fs, data = wavfile.read(filename)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
-    windowed = data * hann(len(data))
-    fft_spectrum = np.fft.rfft(windowed)
-    freqs = np.fft.rfftfreq(len(windowed), 1 / fs)
-    magnitude = np.abs(fft_spectrum)
-
-    magnitude[: int(50 / (fs / len(windowed)))] = 0
-
-    fundamental_freq = freqs[np.argmax(magnitude)]
+def find_fundamental_tone(source, fmin=50, fmax=1000):
+    session = as_session(source)
+    t, f0, confidence = yin_track(session.data, session.fs, fmin=fmin, fmax=fmax)
+    fundamental_freq = pitch_summary(f0, confidence)
     return fundamental_freq
 
 
-def find_formants(filename, num_formants=3):
-    fs, data = wavfile.read(filename)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
-    nperseg = 2048
-    noverlap = nperseg // 2
-    window = hann(nperseg)
-    f, t, Sxx = spectrogram(
-        data,
-        fs,
-        window=window,
-        nperseg=nperseg,
-        noverlap=noverlap,
-        scaling="density",
-        mode="magnitude",
-    )
+def find_formants(source, num_formants=3, engine="peaks"):
+    session = as_session(source)
+    if engine == "peaks":
+        nperseg = 2048
+        noverlap = nperseg // 2
+        f, t, Sxx = session.spectrogram(nperseg, noverlap, "hann")
+        formants = formant_peaks(f, Sxx, num_formants, fmin=300, fmax=5000)
+    elif engine == "lpc":
+        t, formants = lpc_formants(session.data, session.fs, num_formants, fmax=5000)
+    else:
+        raise ValueError(f"Unknown formant engine: {engine}")
+
+    formants = formants[~np.isnan(formants).any(axis=1)]
+    if not len(formants):
+        return np.empty(0)
 
-    formants = []
-    for i in range(len(t)):
-        spectrum = Sxx[:, i]
-        formant_mask = (f > 300) & (f < 5000)
-        peaks, properties = find_peaks(
-            spectrum[formant_mask],
-            height=np.max(spectrum[formant_mask]) * 0.3,
-            distance=40,
-        )
-        peak_freqs = f[formant_mask][peaks]
-        if len(peak_freqs) >= num_formants:
-            top_peaks = peak_freqs[
-                np.argsort(properties["peak_heights"])[::-1][:num_formants]
-            ]
-            formants.append(sorted(top_peaks))
-
-    formants = [f_set for f_set in formants if len(f_set) == num_formants]
-    if not formants:
-        return []
-
-    formants = np.array(formants)
     formant_means = np.median(formants, axis=0)
     return formant_means
 
 
-def plot_spectrogram_with_moments(filename, output_image, moments):
-    fs, data = wavfile.read(filename)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
+def plot_spectrogram_with_moments(source, output_image, moments):
+    session = as_session(source)
+    fs = session.fs
     nperseg = 1024
     noverlap = nperseg // 2
-    window = hann(nperseg)
-    f, t, Sxx = spectrogram(
-        data,
-        fs,
-        window=window,
-        nperseg=nperseg,
-        noverlap=noverlap,
-        scaling="density",
-        mode="magnitude",
+    f, t, Sxx = session.spectrogram(nperseg, noverlap, "hann")
+    render_spectrogram(
+        f,
+        t,
+        Sxx,
+        output_image,
+        fmin=20,
+        fmax=fs / 2,
+        title="Спектрограмма с моментами высокой энергии",
+        moments=moments,
     )
-    Sxx_db = 10 * np.log10(Sxx + 1e-10)
-    plt.figure(figsize=(10, 6))
-    plt.pcolormesh(t, f, Sxx_db, shading="gouraud", cmap="magma")
-    plt.yscale("log")
-    plt.colorbar(label="Уровень (дБ)")
-    plt.ylabel("Частота [Гц]")
-    plt.xlabel("Время [с]")
-    plt.title("Спектрограмма с моментами высокой энергии")
-    plt.ylim([20, fs / 2])
-    for moment in moments:
-        plt.axvline(x=moment, color="cyan", linestyle="--", linewidth=1)
-    plt.savefig(output_image)
-    plt.close()
-
-
-def find_high_energy_moments(filename, delta_t=0.1, energy_threshold=0.8):
-    fs, data = wavfile.read(filename)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
+
+
+def find_high_energy_moments(source, delta_t=0.1, energy_threshold=0.8):
+    session = as_session(source)
     nperseg = 1024
     noverlap = nperseg // 2
-    window = hann(nperseg)
-    f, t, Sxx = spectrogram(
-        data,
-        fs,
-        window=window,
-        nperseg=nperseg,
-        noverlap=noverlap,
-        scaling="density",
-        mode="magnitude",
-    )
+    f, t, Sxx = session.spectrogram(nperseg, noverlap, "hann")
     power = np.mean(Sxx, axis=0)
     energy_normalized = (power - np.min(power)) / (np.max(power) - np.min(power))
     high_energy_indices = np.where(energy_normalized >= energy_threshold)[0]
@@ -196,19 +114,24 @@ def main():
         if not os.path.isfile(file):
             continue
 
+        session = AnalysisSession(file)
+
         spectrogram_image = f"spectrogram_{label}.png"
-        plot_spectrogram(file, spectrogram_image)
+        plot_spectrogram(session, spectrogram_image)
 
-        min_freq, max_freq = find_min_max_frequency(file)
+        min_freq, max_freq = find_min_max_frequency(session)
         print(f"Минимальная частота: {min_freq:.2f} Гц")
         print(f"Максимальная частота: {max_freq:.2f} Гц")
 
-        fundamental_freq = find_fundamental_tone(file)
-        print(f"Основная частота: {fundamental_freq:.2f} Гц")
+        fundamental_freq = find_fundamental_tone(session)
+        if np.isnan(fundamental_freq):
+            print("Основная частота: не определена")
+        else:
+            print(f"Основная частота: {fundamental_freq:.2f} Гц")
 
-        moments = find_high_energy_moments(file, delta_t=0.1, energy_threshold=0.8)
+        moments = find_high_energy_moments(session, delta_t=0.1, energy_threshold=0.8)
 
-        formants = find_formants(file, num_formants=3)
+        formants = find_formants(session, num_formants=3)
         if formants.size == 0:
             print("Форманты не найдены.")
         else:
@@ -217,7 +140,7 @@ def main():
                 print(f"  F{i}: {f_val:.2f} Гц")
 
         spectrogram_moments_image = f"spectrogram_{label}_with_moments.png"
-        plot_spectrogram_with_moments(file, spectrogram_moments_image, moments)
+        plot_spectrogram_with_moments(session, spectrogram_moments_image, moments)
         print(f"Спектрограмма с моментами сохранена как {spectrogram_moments_image}")
 
         print("-" * 50)
@@ -0,0 +1,134 @@
+import numpy as np
+from scipy.fft import irfft, next_fast_len, rfft
+from scipy.signal import resample_poly
+
+FMIN = 50
+FMAX = 1000
+THRESHOLD = 0.1
+OVERSAMPLING = 8
+BATCH_FRAMES = 2048
+
+
+def difference_function(frames, window_length, max_lag):
+    # YIN difference d(tau) = e(0) + e(tau) - 2 r(tau) for every frame, with
+    # r from one batched cross-correlation of the frame head with the frame.
+    nfft = next_fast_len(frames.shape[1], real=True)
+    head = rfft(frames[:, :window_length], nfft, axis=1)
+    spectrum = rfft(frames, nfft, axis=1)
+    spectrum *= np.conjugate(head, out=head)
+    r = irfft(spectrum, nfft, axis=1)[:, : max_lag + 1]
+
+    energy = np.zeros((frames.shape[0], frames.shape[1] + 1))
+    np.cumsum(frames**2, axis=1, out=energy[:, 1:])
+    lagged = energy[:, window_length : window_length + max_lag + 1]
+    lagged = lagged - energy[:, : max_lag + 1]
+
+    return np.maximum(lagged[:, :1] + lagged - 2 * r, 0)
+
+
+def cumulative_mean_normalized(diff):
+    lags = np.arange(diff.shape[1])
+    running = np.cumsum(diff[:, 1:], axis=1)
+    normalized = np.ones_like(diff)
+    np.divide(
+        diff[:, 1:] * lags[1:],
+        running,
+        out=normalized[:, 1:],
+        where=running > 0,
+    )
+    return normalized
+
+
+def pick_period(diff, normalized, min_lag, threshold):
+    frames, lags = normalized.shape
+    search = normalized[:, min_lag:]
+    below = search < threshold
+
+    # The period is the minimum of the first dip under the threshold; frames
+    # without one fall back to the global minimum and stay unvoiced.
+    first = np.argmax(below, axis=1)
+    positions = np.arange(search.shape[1])
+    dip = np.logical_and.accumulate(below | (positions < first[:, None]), axis=1)
+    dip &= positions >= first[:, None]
+    dip[~below.any(axis=1)] = True
+    tau = np.argmin(np.where(dip, search, np.inf), axis=1) + min_lag
+
+    # The sub-sample offset comes from a parabola through the raw difference
+    # function, which the normalization would bias towards longer periods.
+    rows = np.arange(frames)
+    inner = (tau > 1) & (tau < lags - 1)
+    left = diff[rows, np.maximum(tau - 1, 0)]
+    center = diff[rows, tau]
+    right = diff[rows, np.minimum(tau + 1, lags - 1)]
+    curvature = left - 2 * center + right
+    shift = np.divide(
+        left - right,
+        2 * curvature,
+        out=np.zeros(frames),
+        where=inner & (curvature > 0),
+    )
+    return tau + np.clip(shift, -1, 1), normalized[rows, tau]
+
+
+def yin_track(
+    data,
+    fs,
+    fmin=FMIN,
+    fmax=FMAX,
+    hop_ms=10,
+    threshold=THRESHOLD,
+    batch_frames=BATCH_FRAMES,
+):
+    # Periods only need a rate of a few times fmax; parabolic interpolation
+    # recovers the sub-sample part, so the signal is decimated first.
+    factor = max(1, int(fs // (OVERSAMPLING * fmax)))
+    if factor > 1:
+        data = resample_poly(data, 1, factor)
+        fs = fs / factor
+
+    max_lag = int(np.ceil(fs / fmin))
+    min_lag = max(2, int(fs // fmax))
+    window_length = max_lag
+    frame_length = window_length + max_lag
+    hop = max(1, int(round(hop_ms * fs / 1000)))
+
+    if len(data) < frame_length:
+        empty = np.empty(0)
+        return empty, empty, empty
+    frames = np.lib.stride_tricks.sliding_window_view(data, frame_length)[::hop]
+
+    f0 = np.full(len(frames), np.nan)
+    confidence = np.zeros(len(frames))
+    for start in range(0, len(frames), batch_frames):
+        batch = frames[start : start + batch_frames].astype(np.float64)
+        batch -= batch.mean(axis=1, keepdims=True)
+        diff = difference_function(batch, window_length, max_lag)
+        normalized = cumulative_mean_normalized(diff)
+        period, aperiodicity = pick_period(diff, normalized, min_lag, threshold)
+
+        stop = start + len(batch)
+        voiced = aperiodicity < threshold
+        f0[start:stop][voiced] = fs / period[voiced]
+        confidence[start:stop] = np.clip(1 - aperiodicity, 0, 1)
+
+    times = (np.arange(len(frames)) * hop + window_length / 2) / fs
+    return times, f0, confidence
+
+
+def pitch_summary(f0, confidence=None, min_confidence=0.0):
+    # No voiced frame means no pitch, not a pitch of 0 Hz.
+    voiced = ~np.isnan(f0)
+    if confidence is not None:
+        voiced &= confidence >= min_confidence
+    if not voiced.any():
+        return np.nan
+    if confidence is None:
+        return float(np.median(f0[voiced]))
+
+    # Confidence-weighted median, so clearly periodic frames dominate.
+    order = np.argsort(f0[voiced])
+    values, weights = f0[voiced][order], confidence[voiced][order]
+    cumulative = np.cumsum(weights)
+    if cumulative[-1] <= 0:
+        return float(np.median(values))
+    return float(values[np.searchsorted(cumulative, cumulative[-1] / 2)])
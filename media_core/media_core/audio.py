@@ -0,0 +1,44 @@
+import mmap
+
+import numpy as np
+from scipy.io import wavfile
+
+BLOCK_SIZE = 1 << 18
+
+
+def _release_pages(data, start, stop):
+    # Drop already converted pages of the mapping from the resident set;
+    # they are file-backed and untouched, so the kernel can re-read them.
+    mapping = getattr(data, "_mmap", None)
+    if mapping is None or not hasattr(mmap, "MADV_DONTNEED"):
+        return
+
+    base = np.frombuffer(mapping, dtype=np.uint8).ctypes.data
+    first = data[start:stop].ctypes.data - base
+    last = first + (stop - start) * data.strides[0]
+    first -= first % mmap.PAGESIZE
+    last -= last % mmap.PAGESIZE
+    if last > first:
+        mapping.madvise(mmap.MADV_DONTNEED, first, last - first)
+
+
+def read_wav(filename):
+    try:
+        return wavfile.read(filename, mmap=True)
+    except ValueError:
+        # 24-bit and other packed formats cannot be memory-mapped.
+        return wavfile.read(filename)
+
+
+def load_mono(filename, dtype=np.float32, blocksize=BLOCK_SIZE):
+    fs, data = read_wav(filename)
+
+    mono = np.empty(len(data), dtype=dtype)
+    for start in range(0, len(data), blocksize):
+        stop = min(start + blocksize, len(data))
+        if data.ndim > 1:
+            np.mean(data[start:stop], axis=1, dtype=dtype, out=mono[start:stop])
+        else:
+            mono[start:stop] = data[start:stop]
+        _release_pages(data, start, stop)
+    return fs, mono
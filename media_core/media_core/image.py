@@ -0,0 +1,73 @@
+import os
+
+import cv2
+import numpy as np
+
+PNG_COMPRESSION = 3
+
+# EXIF orientation is ignored so pixels come out as stored, like PIL.
+DECODE_FLAGS = {
+    "gray": cv2.IMREAD_GRAYSCALE | cv2.IMREAD_IGNORE_ORIENTATION,
+    "rgb": cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+    # RGB(A) or 2D at the original depth. Gray+alpha comes out as RGBA and
+    # 1-bit images as 0/255 uint8.
+    "unchanged": cv2.IMREAD_UNCHANGED,
+}
+
+TO_RGB = {3: cv2.COLOR_BGR2RGB, 4: cv2.COLOR_BGRA2RGBA}
+FROM_RGB = {3: cv2.COLOR_RGB2BGR, 4: cv2.COLOR_RGBA2BGRA}
+
+
+def decode_image(buffer, mode="rgb", out=None):
+    if mode not in DECODE_FLAGS:
+        raise ValueError(f"Unsupported image mode: {mode}")
+
+    image = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), DECODE_FLAGS[mode])
+    if image is None:
+        raise ValueError("Cannot decode image data.")
+
+    channels = image.shape[2] if image.ndim == 3 else 1
+    if out is not None and (out.shape != image.shape or out.dtype != image.dtype):
+        out = None
+    if channels in TO_RGB:
+        # The channel swap writes straight into the caller's buffer.
+        return cv2.cvtColor(image, TO_RGB[channels], dst=out)
+    # Gray images need no conversion, so a copy into `out` would only cost.
+    return image
+
+
+def load_image(input_path, mode="rgb", out=None):
+    # np.fromfile + imdecode also handles paths cv2.imread cannot open.
+    buffer = np.fromfile(input_path, dtype=np.uint8)
+    try:
+        return decode_image(buffer, mode, out)
+    except ValueError:
+        raise ValueError(f"Cannot decode image: {input_path}") from None
+
+
+def encode_image(image, ext=".png", compression=PNG_COMPRESSION):
+    image = np.asarray(image)
+    if image.dtype == np.bool_:
+        image = image.view(np.uint8) * 255
+
+    channels = image.shape[2] if image.ndim == 3 else 1
+    if channels in FROM_RGB:
+        image = cv2.cvtColor(image, FROM_RGB[channels])
+    else:
+        # Gray images go to the encoder as they are; only a strided view
+        # needs a contiguous copy.
+        image = np.ascontiguousarray(image)
+
+    params = []
+    if ext.lower() == ".png":
+        params = [cv2.IMWRITE_PNG_COMPRESSION, compression]
+
+    ok, encoded = cv2.imencode(ext, image, params)
+    if not ok:
+        raise ValueError(f"Cannot encode image as {ext}")
+    return encoded
+
+
+def save_image(image, output_path, compression=PNG_COMPRESSION):
+    ext = os.path.splitext(output_path)[1] or ".png"
+    encode_image(image, ext, compression).tofile(output_path)
@@ -0,0 +1,35 @@
+import importlib.util
+import os
+import sys
+
+# Labs sit next to the media_core project, which is installed in develop mode.
+ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+_modules = {}
+
+
+def load_lab_module(lab, module="tools"):
+    # Every lab has its own tools.py/main.py, so each one is imported under
+    # a unique name with its directory on sys.path for sibling imports.
+    key = (lab, module)
+    if key in _modules:
+        return _modules[key]
+
+    lab_dir = os.path.join(ROOT, lab)
+    name = f"{lab}_{module}"
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(lab_dir, f"{module}.py")
+    )
+    lab_module = importlib.util.module_from_spec(spec)
+
+    sys.path.insert(0, lab_dir)
+    try:
+        sys.modules[name] = lab_module
+        spec.loader.exec_module(lab_module)
+    finally:
+        sys.path.remove(lab_dir)
+
+    _modules[key] = lab_module
+    return lab_module
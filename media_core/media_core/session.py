@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+from scipy.signal import get_window, spectrogram
+
+from media_core.audio import load_mono
+
+
+class AnalysisSession:
+    def __init__(self, filename):
+        self.filename = filename
+        self._stamp = None
+        self._fs = None
+        self._data = None
+        self._stfts = {}
+        self._views = {}
+
+    def _refresh(self):
+        stat = os.stat(self.filename)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+
+        fs, data = load_mono(self.filename)
+        self._fs, self._data = fs, data
+        self._stfts.clear()
+        self._views.clear()
+        self._stamp = stamp
+
+    @property
+    def fs(self):
+        self._refresh()
+        return self._fs
+
+    @property
+    def data(self):
+        self._refresh()
+        return self._data
+
+    def stft(self, nperseg=1024, noverlap=None, window="hann"):
+        if noverlap is None:
+            noverlap = nperseg // 2
+
+        self._refresh()
+        key = (nperseg, noverlap, window)
+        if key not in self._stfts:
+            # Symmetric window, as scipy.signal.windows.hann(nperseg) gives.
+            self._stfts[key] = spectrogram(
+                self._data,
+                self._fs,
+                window=get_window(window, nperseg, fftbins=False),
+                nperseg=nperseg,
+                noverlap=noverlap,
+                scaling="density",
+                mode="complex",
+            )
+        return self._stfts[key]
+
+    def spectrogram(self, nperseg=1024, noverlap=None, window="hann"):
+        return self._view("magnitude", nperseg, noverlap, window)
+
+    def power(self, nperseg=1024, noverlap=None, window="hann"):
+        return self._view("power", nperseg, noverlap, window)
+
+    def _view(self, kind, nperseg, noverlap, window):
+        if noverlap is None:
+            noverlap = nperseg // 2
+
+        f, t, Zxx = self.stft(nperseg, noverlap, window)
+        key = (kind, nperseg, noverlap, window)
+        if key not in self._views:
+            magnitude = np.abs(Zxx)
+            if kind == "magnitude":
+                view = magnitude
+            else:
+                # One-sided PSD, as spectrogram(mode='psd') scales it.
+                view = magnitude**2
+                view[1 : None if nperseg % 2 else -1] *= 2
+            self._views[key] = view
+        return f, t, self._views[key]
+
+
+def as_session(source):
+    if isinstance(source, AnalysisSession):
+        return source
+    return AnalysisSession(source)
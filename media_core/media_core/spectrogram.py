@@ -0,0 +1,117 @@
+from functools import lru_cache
+
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+from scipy import sparse
+
+WIDTH = 800
+HEIGHT = 480
+
+
+@lru_cache(maxsize=16)
+def colormap_lut(cmap):
+    lut = (plt.get_cmap(cmap)(np.arange(256))[:, :3] * 255).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+
+@lru_cache(maxsize=16)
+def _log_frequency_matrix(n_freqs, df, height, fmin, fmax):
+    freqs = np.arange(n_freqs) * df
+    edges = np.geomspace(fmin, fmax, height + 1)
+
+    # Every bin inside [fmin, fmax] is averaged into the row it falls in;
+    # rows narrower than a bin (low frequencies) take the nearest bin.
+    inside = np.flatnonzero((freqs >= fmin) & (freqs <= fmax))
+    bin_rows = np.minimum(np.searchsorted(edges, freqs[inside], side="right") - 1, height - 1)
+
+    rows = np.arange(height)
+    empty = np.setdiff1d(rows, bin_rows)
+    centers = np.sqrt(edges[empty] * edges[empty + 1])
+    nearest = np.clip(np.rint(centers / df).astype(int), 0, n_freqs - 1)
+
+    row_idx = np.concatenate((bin_rows, empty))
+    col_idx = np.concatenate((inside, nearest))
+    counts = np.bincount(row_idx, minlength=height)
+    matrix = sparse.csr_matrix(
+        (1.0 / counts[row_idx], (row_idx, col_idx)), shape=(height, n_freqs)
+    )
+    return matrix
+
+
+def log_frequency_matrix(f, height, fmin, fmax):
+    df = float(f[1] - f[0])
+    return _log_frequency_matrix(len(f), df, height, float(fmin), float(fmax))
+
+
+def pool_time(Sxx, width, pooling="max"):
+    n_times = Sxx.shape[1]
+    if n_times <= width:
+        return Sxx[:, (np.arange(width) * n_times) // width]
+
+    starts = (np.arange(width) * n_times) // width
+    if pooling == "max":
+        return np.maximum.reduceat(Sxx, starts, axis=1)
+    if pooling == "mean":
+        sizes = np.diff(np.append(starts, n_times))
+        return np.add.reduceat(Sxx, starts, axis=1) / sizes
+    raise ValueError(f"Unsupported pooling: {pooling}")
+
+
+def spectrogram_raster(f, Sxx, width=WIDTH, height=HEIGHT, fmin=20, fmax=None, pooling="max"):
+    fmax = f[-1] if fmax is None else fmax
+    pooled = pool_time(Sxx, width, pooling)
+    reduced = log_frequency_matrix(f, height, fmin, fmax) @ pooled
+    return 10 * np.log10(reduced + 1e-10)[::-1]
+
+
+def render_spectrogram(
+    f,
+    t,
+    Sxx,
+    output_image,
+    width=WIDTH,
+    height=HEIGHT,
+    fmin=20,
+    fmax=None,
+    cmap="magma",
+    pooling="max",
+    title=None,
+    moments=(),
+    decorate=True,
+):
+    fmax = f[-1] if fmax is None else fmax
+    raster = spectrogram_raster(f, Sxx, width, height, fmin, fmax, pooling)
+
+    low, high = raster.min(), raster.max()
+    scale = 255 / (high - low) if high > low else 0
+    image = colormap_lut(cmap)[((raster - low) * scale).astype(np.uint8)]
+
+    if not decorate:
+        for moment in moments:
+            column = int((moment - t[0]) / (t[-1] - t[0]) * (width - 1)) if len(t) > 1 else 0
+            if 0 <= column < width:
+                image[::4, column] = (0, 255, 255)
+        Image.fromarray(image).save(output_image)
+        return
+
+    # The raster is already on the log-frequency grid, so the axis is linear
+    # in log10(f) with frequency tick labels.
+    fig, ax = plt.subplots(figsize=(10, 6))
+    extent = [t[0], t[-1], np.log10(fmin), np.log10(fmax)]
+    ax.imshow(image, aspect="auto", extent=extent, interpolation="nearest")
+    ticks = [tick for tick in (20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000) if fmin <= tick <= fmax]
+    ax.set_yticks(np.log10(ticks))
+    ax.set_yticklabels([str(tick) for tick in ticks])
+
+    mappable = plt.cm.ScalarMappable(norm=plt.Normalize(low, high), cmap=cmap)
+    fig.colorbar(mappable, ax=ax, label="Уровень (дБ)")
+    ax.set_ylabel("Частота [Гц]")
+    ax.set_xlabel("Время [с]")
+    if title:
+        ax.set_title(title)
+    for moment in moments:
+        ax.axvline(x=moment, color="cyan", linestyle="--", linewidth=1)
+    fig.savefig(output_image)
+    plt.close(fig)
@@ -0,0 +1,209 @@
+import contextlib
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+TRACE_ENV = "MEDIA_CORE_TRACE"
+
+_DISABLED = contextlib.nullcontext()
+_tracer = None
+
+
+class Tracer:
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.events = []
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._owns_tracemalloc = False
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+
+    def stop(self):
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextlib.contextmanager
+    def stage(self, name, args=None):
+        stack = self._stack()
+        args = dict(args or {})
+        # Nested stages inherit the item, so every event says what it worked on.
+        if stack and "item" in stack[-1]["args"] and "item" not in args:
+            args["item"] = stack[-1]["args"]["item"]
+
+        frame = {"args": args, "current": 0, "peak": 0}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            # tracemalloc has a single peak counter, so it is reset per stage
+            # and the parent keeps the maximum of what its children saw.
+            tracemalloc.reset_peak()
+            frame["current"] = frame["peak"] = current
+        stack.append(frame)
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            stack.pop()
+
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(frame["peak"], peak)
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+                args["alloc_bytes"] = current - frame["current"]
+                args["peak_bytes"] = peak - frame["current"]
+            args["cpu_ms"] = cpu * 1e3
+
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": "stage",
+                    "ph": "X",
+                    "ts": (wall_start - self._origin) * 1e6,
+                    "dur": wall * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def summary(self):
+        stages = {}
+        for event in self.events:
+            args = event["args"]
+            total = stages.setdefault(
+                event["name"],
+                {
+                    "count": 0,
+                    "wall": 0.0,
+                    "cpu": 0.0,
+                    "alloc_bytes": 0,
+                    "peak_bytes": 0,
+                },
+            )
+            total["count"] += 1
+            total["wall"] += event["dur"] / 1e6
+            total["cpu"] += args["cpu_ms"] / 1e3
+            total["alloc_bytes"] += args.get("alloc_bytes", 0)
+            total["peak_bytes"] = max(total["peak_bytes"], args.get("peak_bytes", 0))
+        return dict(sorted(stages.items(), key=lambda item: -item[1]["wall"]))
+
+    def format_summary(self):
+        lines = [
+            f"{'stage':40s} {'count':>7s} {'wall, s':>10s} {'cpu, s':>10s} "
+            f"{'alloc, MiB':>11s} {'peak, MiB':>10s}"
+        ]
+        for name, total in self.summary().items():
+            lines.append(
+                f"{name:40s} {total['count']:7d} {total['wall']:10.3f} "
+                f"{total['cpu']:10.3f} {total['alloc_bytes'] / 2**20:11.1f} "
+                f"{total['peak_bytes'] / 2**20:10.1f}"
+            )
+        return "\n".join(lines)
+
+    def save(self, output_path):
+        trace = {
+            "traceEvents": sorted(self.events, key=lambda event: event["ts"]),
+            "displayTimeUnit": "ms",
+            "summary": self.summary(),
+        }
+        with open(output_path, "w", encoding="utf-8") as file:
+            json.dump(trace, file)
+
+
+def active_tracer():
+    return _tracer
+
+
+def stage(name, **args):
+    if _tracer is None:
+        return _DISABLED
+    return _tracer.stage(name, args)
+
+
+def traced(func=None, *, name=None):
+    if func is None:
+        return functools.partial(traced, name=name)
+
+    stage_name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _tracer is None:
+            return func(*args, **kwargs)
+        with _tracer.stage(stage_name):
+            return func(*args, **kwargs)
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def _resolve(module):
+    return sys.modules[module] if isinstance(module, str) else module
+
+
+@contextlib.contextmanager
+def instrumented(*modules):
+    # Functions are swapped in every given namespace, so `from tools import x`
+    # in main.py is covered as long as main.py is listed too.
+    modules = [_resolve(module) for module in modules]
+    names = {module.__name__ for module in modules}
+    patched = []
+    for module in modules:
+        for attr, value in list(vars(module).items()):
+            if (
+                attr.startswith("_")
+                or not inspect.isfunction(value)
+                or inspect.isgeneratorfunction(value)
+                or getattr(value, "__traced__", False)
+                or value.__module__ not in names
+            ):
+                continue
+            setattr(module, attr, traced(value))
+            patched.append((module, attr, value))
+    try:
+        yield
+    finally:
+        for module, attr, value in reversed(patched):
+            setattr(module, attr, value)
+
+
+@contextlib.contextmanager
+def tracing(output_path=None, memory=True, modules=()):
+    global _tracer
+
+    output_path = output_path or os.environ.get(TRACE_ENV)
+    if not output_path or _tracer is not None:
+        yield _tracer
+        return
+
+    tracer = Tracer(memory=memory)
+    tracer.start()
+    _tracer = tracer
+    try:
+        with instrumented(*modules):
+            yield tracer
+    finally:
+        _tracer = None
+        tracer.stop()
+        tracer.save(output_path)
+        print(tracer.format_summary())
@@ -0,0 +1,232 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+import numpy as np
+from media_core import image as image_io
+from media_core import trace
+
+from stages import STAGES, apply_lut
+
+SOURCE = "source"
+IMAGE_EXTENSIONS = (".png", ".bmp", ".jpg", ".jpeg")
+
+
+@dataclass
+class Node:
+    stage: str
+    inputs: List[str]
+    params: dict = field(default_factory=dict)
+
+
+@dataclass
+class Step:
+    node_id: str
+    name: str
+    inputs: List[str]
+    func: Optional[Callable] = None
+    params: dict = field(default_factory=dict)
+    lut: Optional[np.ndarray] = None
+
+    def __call__(self, *images):
+        if self.lut is not None:
+            return apply_lut(images[0], self.lut)
+        return self.func(*images, **self.params)
+
+
+class Pipeline:
+    def __init__(self, mode="rgb"):
+        self.mode = mode
+        self.nodes = {}
+        self.outputs = {}
+
+    def add(self, node_id, stage, inputs=None, **params):
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        if node_id == SOURCE or node_id in self.nodes:
+            raise ValueError(f"Duplicate node id: {node_id}")
+
+        if inputs is None:
+            inputs = [next(reversed(self.nodes), SOURCE)]
+        elif isinstance(inputs, str):
+            inputs = [inputs]
+        # Inputs must already exist, so insertion order is a topological order.
+        for input_id in inputs:
+            if input_id != SOURCE and input_id not in self.nodes:
+                raise ValueError(f"Node {node_id} reads unknown input: {input_id}")
+        if len(inputs) != STAGES[stage].arity:
+            raise ValueError(
+                f"Stage {stage} takes {STAGES[stage].arity} inputs, got {len(inputs)}"
+            )
+
+        self.nodes[node_id] = Node(stage, list(inputs), params)
+        return node_id
+
+    def output(self, node_id, pattern):
+        if node_id != SOURCE and node_id not in self.nodes:
+            raise ValueError(f"Unknown output node: {node_id}")
+        self.outputs[node_id] = pattern
+        return self
+
+    @classmethod
+    def from_spec(cls, spec):
+        pipeline = cls(mode=spec.get("mode", "rgb"))
+        for node in spec["nodes"]:
+            pipeline.add(
+                node["id"], node["stage"], node.get("inputs"), **node.get("params", {})
+            )
+        for node_id, pattern in spec["outputs"].items():
+            pipeline.output(node_id, pattern)
+        return pipeline
+
+    @classmethod
+    def load(cls, spec_path):
+        with open(spec_path, encoding="utf-8") as file:
+            return cls.from_spec(json.load(file))
+
+    def _needed(self):
+        needed = set()
+        pending = [node_id for node_id in self.outputs if node_id != SOURCE]
+        while pending:
+            node_id = pending.pop()
+            if node_id in needed:
+                continue
+            needed.add(node_id)
+            pending.extend(
+                input_id
+                for input_id in self.nodes[node_id].inputs
+                if input_id != SOURCE
+            )
+        return needed
+
+    def compile(self):
+        needed = self._needed()
+        consumers = {}
+        for node_id in needed:
+            for input_id in self.nodes[node_id].inputs:
+                consumers[input_id] = consumers.get(input_id, 0) + 1
+
+        steps = []
+        for node_id, node in self.nodes.items():
+            if node_id not in needed:
+                continue
+            stage = STAGES[node.stage]
+            if not stage.pixelwise:
+                steps.append(
+                    Step(node_id, node.stage, node.inputs, stage.resolve(), node.params)
+                )
+                continue
+
+            lut = stage.lut(**node.params)
+            (input_id,) = node.inputs
+            previous = steps[-1] if steps else None
+            # A lookup feeding only another lookup is never materialised:
+            # the two tables are composed and applied in one pass.
+            if (
+                previous is not None
+                and previous.lut is not None
+                and previous.node_id == input_id
+                and consumers[input_id] == 1
+                and input_id not in self.outputs
+            ):
+                steps[-1] = Step(
+                    node_id,
+                    f"{previous.name}+{node.stage}",
+                    previous.inputs,
+                    lut=lut[previous.lut],
+                )
+            else:
+                steps.append(Step(node_id, node.stage, node.inputs, lut=lut))
+        return steps
+
+    def run_image(self, image, steps=None):
+        steps = self.compile() if steps is None else steps
+        remaining = {}
+        for step in steps:
+            for input_id in step.inputs:
+                remaining[input_id] = remaining.get(input_id, 0) + 1
+
+        values = {SOURCE: image}
+        for step in steps:
+            with trace.stage(step.name):
+                values[step.node_id] = step(*(values[i] for i in step.inputs))
+            # Intermediates are dropped as soon as their last consumer ran.
+            for input_id in step.inputs:
+                remaining[input_id] -= 1
+                if remaining[input_id] == 0 and input_id not in self.outputs:
+                    del values[input_id]
+
+        return {node_id: values[node_id] for node_id in self.outputs}
+
+    def run_file(self, input_path, output_dir, steps=None):
+        row = {"path": input_path, "outputs": [], "seconds": 0.0, "error": ""}
+        started = time.perf_counter()
+        stem, ext = os.path.splitext(os.path.basename(input_path))
+        try:
+            with trace.stage("image", item=input_path):
+                with trace.stage("decode"):
+                    image = image_io.load_image(input_path, self.mode)
+                results = self.run_image(image, steps)
+                for node_id, result in results.items():
+                    output_path = os.path.join(
+                        output_dir,
+                        self.outputs[node_id].format(stem=stem, ext=ext, node=node_id),
+                    )
+                    with trace.stage("encode"):
+                        save_result(result, output_path)
+                    row["outputs"].append(output_path)
+        except Exception as error:
+            row["error"] = f"{type(error).__name__}: {error}"
+        row["seconds"] = time.perf_counter() - started
+        return row
+
+    def _run_files(self, input_paths, output_dir):
+        # One compiled plan per worker chunk; lab modules are loaded once.
+        steps = self.compile()
+        return [self.run_file(path, output_dir, steps) for path in input_paths]
+
+    def run(
+        self, source, output_dir, workers=None, chunksize=None, trace_output=None
+    ):
+        input_paths = collect_images(source)
+        os.makedirs(output_dir, exist_ok=True)
+
+        # Traces are collected in this process only.
+        if workers == 1 or trace_output is not None:
+            with trace.tracing(trace_output):
+                return self._run_files(input_paths, output_dir)
+
+        workers = workers or os.cpu_count()
+        chunksize = chunksize or max(1, min(64, len(input_paths) // (4 * workers)))
+        chunks = [
+            input_paths[start : start + chunksize]
+            for start in range(0, len(input_paths), chunksize)
+        ]
+        rows = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_rows in executor.map(
+                self._run_files, chunks, [output_dir] * len(chunks)
+            ):
+                rows.extend(chunk_rows)
+        return rows
+
+
+def collect_images(source):
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, filename)
+            for filename in os.listdir(source)
+            if filename.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    return [source]
+
+
+def save_result(result, output_path):
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    if output_path.endswith(".npy"):
+        np.save(output_path, result)
+    else:
+        image_io.save_image(result, output_path)
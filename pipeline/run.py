@@ -0,0 +1,37 @@
+import argparse
+import sys
+
+from graph import Pipeline
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run an image pipeline spec")
+    parser.add_argument("spec", help="JSON pipeline spec")
+    parser.add_argument("source", help="image file or folder with images")
+    parser.add_argument("output_dir")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunksize", type=int)
+    parser.add_argument("--trace", help="write a Chrome trace of the run here")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pipeline = Pipeline.load(args.spec)
+    rows = pipeline.run(
+        args.source,
+        args.output_dir,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        trace_output=args.trace,
+    )
+
+    failed = [row for row in rows if row["error"]]
+    for row in failed:
+        print(f"Ошибка при обработке {row['path']}: {row['error']}")
+    print(f"Обработано изображений: {len(rows) - len(failed)} из {len(rows)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+from media_core.labs import load_lab_module
+
+LEVELS = np.arange(256)
+
+
+@dataclass(frozen=True)
+class Stage:
+    lab: Optional[str] = None
+    function: Optional[str] = None
+    # Pixelwise uint8 -> uint8 stages are described by a 256-entry table,
+    # so neighbouring ones can be fused into a single lookup.
+    lut: Optional[Callable] = None
+    arity: int = 1
+
+    @property
+    def pixelwise(self):
+        return self.lut is not None
+
+    def resolve(self):
+        return getattr(load_lab_module(self.lab), self.function)
+
+
+def _gamma_lut(gamma):
+    return load_lab_module("lab_08").gamma_lut(gamma)
+
+
+def _to_mask_lut():
+    return (LEVELS >= 128).astype(np.uint8)
+
+
+def _to_image_lut():
+    return np.where(LEVELS > 0, 255, 0).astype(np.uint8)
+
+
+def _invert_lut():
+    return (255 - LEVELS).astype(np.uint8)
+
+
+def _threshold_lut(level=128):
+    return np.where(LEVELS >= level, 255, 0).astype(np.uint8)
+
+
+STAGES = {
+    "stretch": Stage("lab_01", "stretch_image"),
+    "compress": Stage("lab_01", "compress_image"),
+    "resample": Stage("lab_01", "resample_image_one_pass"),
+    "resample_two_pass": Stage("lab_01", "resample_image_two_pass"),
+    "grayscale": Stage("lab_02", "rgb_to_grayscale"),
+    "niblack": Stage("lab_02", "niblack_binarization"),
+    "binarize": Stage("lab_03", "binarize"),
+    "majority": Stage("lab_03", "filter_image"),
+    "xor": Stage("lab_03", "xor", arity=2),
+    "to_grayscale": Stage("lab_04", "to_grayscale"),
+    "scharr": Stage("lab_04", "apply_scharr"),
+    "haralick": Stage("lab_08", "haralick_matrix"),
+    "gamma": Stage(lut=_gamma_lut),
+    "to_mask": Stage(lut=_to_mask_lut),
+    "to_image": Stage(lut=_to_image_lut),
+    "invert": Stage(lut=_invert_lut),
+    "threshold": Stage(lut=_threshold_lut),
+}
+
+
+def apply_lut(image, lut):
+    if image.dtype != np.uint8:
+        raise ValueError(f"Pixelwise stages need uint8 images, got {image.dtype}")
+    if image.ndim in (2, 3) and (image.ndim == 2 or image.shape[2] <= 4):
+        return cv2.LUT(image, lut)
+    return np.take(lut, image)